@@ -1,76 +1,42 @@
-import psutil
-import time
-from dataclasses import dataclass
-from typing import List, Tuple
-from queue import PriorityQueue
+import argparse
 import sys
 import os
-
-def print_memory_usage() -> float:
-    """Get current process memory usage in MB"""
-    process = psutil.Process()
-    return process.memory_info().rss / (1024 * 1024)
-
-@dataclass
-class State:
-    x: int
-    y: int
-    stones: List[Tuple[int, int, int]]  # List of tuples (x, y, weight)
-    g: int
-    f: int
-
-    def __lt__(self, other):
-        if self.f != other.f:
-            return self.f < other.f
-        return self.g < other.g
-
-    def __eq__(self, other):
-        if not isinstance(other, State):
-            return False
-        return (self.x == other.x and 
-                self.y == other.y and 
-                sorted(self.stones) == sorted(other.stones))
-
-    def __hash__(self):
-        return hash((self.x, self.y, 
-                    tuple(sorted(self.stones))))
-
-def is_valid(x: int, y: int, grid: List[str]) -> bool:
-    return not (x < 0 or y < 0 or x >= len(grid) or 
-                y >= len(grid[0]) or grid[x][y] == '#')
-
-def get_heuristic(state: State, switches: List[Tuple[int, int]]) -> int:
-    """Calculate heuristic as sum of minimal weighted distances from stones to switches."""
-    total = 0
-    for stone in state.stones:
-        min_dist = min(abs(stone[0] - sx) + abs(stone[1] - sy) for sx, sy in switches)
-        total += min_dist * stone[2]
-    return total
-
-def is_goal(state: State, switches: List[Tuple[int, int]]) -> bool:
-    stone_positions = {(stone[0], stone[1]) for stone in state.stones}
-    return stone_positions == set(switches)
-
-def read_input(filename):
-    """Read and parse input file"""
-    with open(filename, 'r') as file:
-        lines = file.readlines()
-    
-    # Read the first line containing numbers
-    first_line = lines[0].strip()
-    numbers = [int(x) for x in first_line.split()]
-    
-    # Read the grid lines
-    grid = [line.rstrip('\n') for line in lines[1:] if line.strip()]
-    
-    return numbers, grid
-
-def search(filename, id):
+from functools import partial
+
+from src.budget import Budget
+from src.cache import SolutionCache
+from src.frontier import FRONTIERS, TIE_BREAKS
+from src.heuristic import HEURISTICS, INF
+from src.level import read_level
+from src.options import add_search_arguments, search_options
+from src.stats import Stats, write_record
+from src.tree import ROOT, SearchTree
+
+# Starting inflation of the anytime search and how much each round lowers it
+ANYTIME_EPSILON = 3.0
+EPSILON_STEP = 0.5
+
+def search(filename, id, pushes=False, dead_squares=True, deadlocks=True, heuristic='matching', frontier='heap', tie_break='high-g', epsilon=1.0, anytime=False, macros=(), budget=None, stats=None):
+    """A* on f = g + epsilon * h; epsilon > 1 is weighted A*, whose solutions
+    weigh at most epsilon times the optimum.
+
+    In anytime mode (ARA*) the search starts with a large epsilon, writes
+    the solution it finds together with its suboptimality bound, then lowers
+    epsilon and carries on with the same tree and cost tables, writing every
+    improvement, until epsilon is 1 and the solution is optimal. States
+    improved after they were expanded wait in incons until the next round.
+
+    tie_break orders the heap among states of equal f (see TIE_BREAKS).
+    """
+    stats = (stats or Stats()).start()
     # Read input from file
-    numbers, grid = read_input(filename)
+    try:
+        level = read_level(filename, dead_squares, deadlocks, stats, macros)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
 
-    start_time = time.time()
-    node = 0
+    budget = (budget or Budget()).start()
 
     # Create output directory and filename
     output_dir = os.path.join('output', 'A')
@@ -78,158 +44,128 @@ def search(filename, id):
         os.makedirs(output_dir)
     output_filename = os.path.join(output_dir, f'output-{id:02d}.txt')
 
-    # Initialize starting state
-    Ax = Ay = -1
-    switches = []
-    start_stones = []
-    pos = 0
-
-    # Process grid to find object positions
-    for i in range(len(grid)):
-        for j in range(len(grid[i])):
-            cell = grid[i][j]
-            if cell == '@':
-                Ax, Ay = i, j
-            elif cell == '$':
-                if pos < len(numbers):
-                    weight = numbers[pos]
-                    start_stones.append((i, j, weight))
-                    pos += 1
-            elif cell == '.':
-                switches.append((i, j))
-            elif cell == '*':  # Stone on a switch
-                if pos < len(numbers):
-                    weight = numbers[pos]
-                    start_stones.append((i, j, weight))
-                    switches.append((i, j))
-                    pos += 1
-            # else: empty space
-
-    if Ax == -1 or Ay == -1:
-        print("Error: Player starting position '@' not found.")
-        return
-
-    start_state = State(
-        x=Ax,
-        y=Ay,
-        stones=start_stones,
-        g=0,
-        f=0  # Will compute f below
-    )
-
-    start_state.f = start_state.g + get_heuristic(start_state, switches)
-
-    # Movement directions: up, down, left, right
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    dir_chars = ['u', 'd', 'l', 'r']
-
-    # Priority queue for A* algorithm
-    queue = PriorityQueue()
-    queue.put(start_state)
-    g_score = {start_state: start_state.g}
-    before = {}
-
-    last = None  # Variable to store the goal state
+    get_heuristic = HEURISTICS[heuristic](level)
+    stats.lap('precompute')
+    expand, start_player = level.search_space(pushes)
+    start_key = level.hash(start_player, level.stones)
+
+    # Open list of state keys; the states themselves are kept in states,
+    # together with their node in the tree of parent pointers
+    queue = open_list(frontier, tie_break)
+    tree = SearchTree()
+    states = {start_key: (start_player, level.stones, ROOT)}
+    g_score = {start_key: 0}
+
+    goal = None  # Key of the cheapest goal state found so far
+    best = INF  # and its weight
+    if level.is_goal(level.stones):
+        goal, best = start_key, 0
+    elif get_heuristic(level.stones) < INF:
+        queue.push(start_key, int(epsilon * get_heuristic(level.stones)), 0)
+    closed = set()  # States expanded in this round (anytime mode only)
+    incons = set()  # Closed states improved since; reopened next round
+
+    while True:
+        # Expand until no open state can lead to a goal cheaper than best
+        while queue:
+            if budget.exceeded(stats.expanded):
+                break
+            current, g = queue.pop()
+            player, stones, parent = states[current]
+            f = g + int(epsilon * get_heuristic(stones))
+            if f >= best:
+                queue.push(current, f, g)  # Still open for the next round
+                break
+            stats.expand(len(queue) + 1)
+            if anytime:
+                closed.add(current)
+
+            successors = expand(player, stones, current)
+            stats.generated += len(successors)
+            for action, new_player, new_stones, cost, key in successors:
+                new_g = g + cost
+
+                if (key in g_score and new_g >= g_score[key]):
+                    stats.duplicates += 1
+                    continue
 
-    # A* algorithm
-    while not queue.empty():
-        node += 1
-        current_state = queue.get()
+                h = get_heuristic(new_stones)
+                if h == INF:  # Some stone can no longer reach a free switch
+                    continue
 
-        if is_goal(current_state, switches):
-            last = current_state
+                g_score[key] = new_g
+                states[key] = (new_player, new_stones, tree.add(parent, action))
+                if level.is_goal(new_stones):
+                    if new_g < best:
+                        goal, best = key, new_g
+                elif key in closed:
+                    incons.add(key)
+                else:
+                    queue.push(key, new_g + int(epsilon * h), new_g)
+
+        if goal is None:
             break
-
-        for v, dir_char in zip(directions, dir_chars):
-            new_x = current_state.x + v[0]
-            new_y = current_state.y + v[1]
-
-            if not is_valid(new_x, new_y, grid):
-                continue
-
-            # Check if there is a stone at the new position
-            stone_at_new_pos = None
-            for idx, stone in enumerate(current_state.stones):
-                if (stone[0], stone[1]) == (new_x, new_y):
-                    stone_at_new_pos = (idx, stone)
-                    break
-
-            # Create new stones list
-            new_stones = [stone for stone in current_state.stones]
-            new_g = current_state.g
-
-            if stone_at_new_pos:
-                # There is a stone at new_x, new_y
-                stone_idx, stone = stone_at_new_pos
-                # Check if we can push the stone
-                push_x = new_x + v[0]
-                push_y = new_y + v[1]
-                if not is_valid(push_x, push_y, grid):
-                    continue
-                # Check if another stone is at push_x, push_y
-                if any((s[0], s[1]) == (push_x, push_y) for s in current_state.stones):
-                    continue
-                # Push the stone
-                stone_weight = stone[2]
-                new_g += stone_weight
-                # Update the stone's position
-                new_stones[stone_idx] = (push_x, push_y, stone_weight)
-                # Move the player to new_x, new_y
-                action = dir_char.upper()
-            else:
-                # No stone at new_x, new_y
-                action = dir_char.lower()
-
-            new_state = State(
-                x=new_x,
-                y=new_y,
-                stones=new_stones,
-                g=new_g,
-                f=0  # Will compute f below
-            )
-
-            new_state.f = new_state.g + get_heuristic(new_state, switches)
-
-            if (new_state in g_score and new_g >= g_score[new_state]):
-                continue
-
-            before[new_state] = (current_state, action)
-            g_score[new_state] = new_g
-            queue.put(new_state)
-
-    # Calculate time and memory usage
-    time_ms = (time.time() - start_time) * 1000
-    memory_usage = print_memory_usage()
-
-    # Write results to output file
-    with open(output_filename, 'w') as f_out:
-        if last is not None:
-            # Create path string
-            path = []
-            current = last
-            while current != start_state:
-                prev_state, move = before[current]
-                path.append(move)
-                current = prev_state
-
-            path_str = ''.join(reversed(path))
-            steps = len(path)
-
-            # Write information to file
-            f_out.write('A*\n')
-            f_out.write('Steps: {}, Weight: {}, Node: {}, Time (ms): {:.2f}, Memory (MB): {:.2f}\n'.format(
-                steps, last.g,node, time_ms, memory_usage))
-            f_out.write(path_str + '\n')
-        else:
-            f_out.write('No solution found.\n')
-            f_out.write('Nodes Expanded: {}, Time (ms): {:.2f}, Memory (MB): {:.2f}\n'.format(
-                node, time_ms, memory_usage))
+        bound = 1.0
+        if epsilon > 1 or budget.reason:
+            # Every open or reopened state is a lower bound on the optimal weight
+            lowest = min((g_score[key] + get_heuristic(states[key][1])
+                          for key in list(queue.live) + list(incons)), default=best)
+            bound = max(1.0, best / lowest) if lowest > 0 else 1.0
+            if not budget.reason:
+                bound = min(epsilon, bound)
+
+        stats.lap('search')
+        # Create path string
+        path_str = level.solution(tree.path(states[goal][2]), pushes)
+        stats.lap('reconstruct')
+        stats.finish(level, len(g_score))
+        label = 'A*' if epsilon == 1 and bound == 1 and not anytime else f'A* (epsilon {epsilon:g}, within {bound:.2f}x of optimal)'
+        write_record(output_filename, label, stats, path_str, best, budget)
+        if anytime:
+            print(f"Epsilon {epsilon:g}: weight {best}, within {bound:.2f}x of optimal")
+        if not anytime or epsilon <= 1 or bound <= 1 or budget.reason:
+            return
+
+        # Next round: lower epsilon, reopen incons and reorder the open list
+        epsilon = max(1.0, epsilon - EPSILON_STEP)
+        reopened = open_list(frontier, tie_break)
+        for key in list(queue.live) + list(incons):
+            g = g_score[key]
+            reopened.push(key, g + int(epsilon * get_heuristic(states[key][1])), g)
+        queue = reopened
+        closed.clear()
+        incons.clear()
+
+    stats.lap('search')
+    stats.finish(level, len(g_score))
+    write_record(output_filename, 'A*', stats, None, None, budget)
+
+def open_list(frontier, tie_break):
+    """Empty open list; the tie-break policy only applies to the heap."""
+    return FRONTIERS[frontier](tie_break) if frontier == 'heap' else FRONTIERS[frontier]()
 
 def main():
+    parser = argparse.ArgumentParser(description='A* search')
+    add_search_arguments(parser, heuristic=True, cache=True)
+    parser.add_argument('--frontier', choices=sorted(FRONTIERS), default='heap',
+                        help='open list implementation (default: heap)')
+    parser.add_argument('--tie-break', choices=sorted(TIE_BREAKS), default='high-g',
+                        help='order of the heap among states of equal f (default: high-g)')
+    parser.add_argument('--epsilon', type=float,
+                        help=f'heuristic inflation; above 1 trades optimality for speed '
+                             f'(default: 1, or {ANYTIME_EPSILON:g} with --anytime)')
+    parser.add_argument('--anytime', action='store_true',
+                        help='write a first solution fast, then keep improving it down to epsilon 1 (ARA*)')
+    args = parser.parse_args()
+    epsilon = args.epsilon if args.epsilon is not None else ANYTIME_EPSILON if args.anytime else 1.0
+    if epsilon < 1:
+        parser.error('epsilon must be at least 1')
+
+    solve = partial(SolutionCache(args.cache).run, 'A', search) if args.cache else search
     for id in range(1,11):  # Adjust range as needed
         input_filename = os.path.join('input', f'input-{id:02d}.txt')
         print(f"Processing {input_filename}")
-        search(input_filename, id)
+        solve(input_filename, id, *search_options(args), args.heuristic, args.frontier, args.tie_break, epsilon, args.anytime, args.macros)
 
 if __name__ == "__main__":
     main()
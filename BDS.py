@@ -0,0 +1,142 @@
+import argparse
+import os
+
+from src.budget import Budget
+from src.frontier import FRONTIERS
+from src.level import read_level
+from src.options import add_search_arguments, search_options
+from src.stats import Stats, write_record
+from src.tree import ROOT, SearchTree
+
+class Side:
+    """One direction of the search: its open list, cost table and tree."""
+
+    def __init__(self, expand, frontier):
+        self.expand = expand
+        self.queue = FRONTIERS[frontier]()
+        self.tree = SearchTree()
+        self.states = {}  # key -> (player, stones, tree node)
+        self.costs = {}
+        self.last = 0  # cost of the last state expanded; the rest cost at least as much
+
+    def add(self, key, player, stones, cost, node):
+        self.states[key] = (player, stones, node)
+        self.costs[key] = cost
+        self.queue.push(key, cost, cost)
+
+def bidirectional(level, frontier='heap', budget=None, stats=None):
+    """Bidirectional uniform-cost search over pushes.
+
+    The forward side pushes from the start state and the backward side pulls
+    from every solved state (any region the player may be left in). A state
+    reached by both sides gives a solution of weight forward + backward cost.
+    Dijkstra pops never decrease, so once the last costs expanded on both
+    sides add up to the best such weight, nothing cheaper can be found.
+
+    Returns (push codes, weight), or (None, None) if there is no solution
+    or the budget ran out, like UCS.
+    """
+    budget = (budget or Budget()).start()
+    stats = stats or Stats().start()
+
+    forward = Side(level.push_successors, frontier)
+    backward = Side(level.pull_predecessors, frontier)
+    start_player = level.search_space(pushes=True)[1]
+    forward.add(level.hash(start_player, level.stones), start_player, level.stones, 0, ROOT)
+    for player, stones in level.goal_states():
+        key = level.hash(player, stones)
+        if key not in backward.costs:
+            backward.add(key, player, stones, 0, ROOT)
+
+    best = None  # Cheapest weight through a meeting state
+    meeting = None
+    while forward.queue and backward.queue:
+        if budget.exceeded(stats.expanded):
+            break
+        # Expand the side with the smaller open list
+        side, other = (forward, backward) if len(forward.queue) <= len(backward.queue) else (backward, forward)
+        stats.expand(len(forward.queue) + len(backward.queue))
+        key, cost = side.queue.pop()
+        side.last = cost
+        if best is not None and forward.last + backward.last >= best:
+            break
+        player, stones, node = side.states[key]
+
+        successors = side.expand(player, stones, key)
+        stats.generated += len(successors)
+        for move, new_player, new_stones, weight, new_key in successors:
+            new_cost = cost + weight
+            if new_key in side.costs and new_cost >= side.costs[new_key]:
+                stats.duplicates += 1
+                continue
+            side.add(new_key, new_player, new_stones, new_cost, side.tree.add(node, move))
+            if new_key in other.costs:
+                total = new_cost + other.costs[new_key]
+                if best is None or total < best:
+                    best = total
+                    meeting = new_key
+        # The start may already be solved, or meet a goal state before any expansion
+        if best is None and key in other.costs:
+            best = cost + other.costs[key]
+            meeting = key
+
+    stats.lap('search')
+    stats.finish(level, len(forward.costs) + len(backward.costs))
+    # A meeting found before the budget ran out is not known to be the cheapest
+    if meeting is None or budget.reason:
+        return None, None
+    return join(level, forward, backward, meeting), best
+
+def join(level, forward, backward, key):
+    """Push codes from the start to the goal through the meeting state key.
+
+    The backward pushes refer to the stones by their index in the backward
+    states, which may differ from the forward one when stones of equal
+    weight swap places, so they are matched up by cell.
+    """
+    pushes = forward.tree.path(forward.states[key][2])
+    stones = list(forward.states[key][1])
+    pulled = list(backward.states[key][1])
+    # The backward tree stores the pushes from the goal side inwards
+    for move in reversed(backward.tree.path(backward.states[key][2])):
+        index, direction = divmod(move, 4)
+        offset = level.offsets[direction]
+        cell = pulled[index]
+        pulled[index] = cell + offset
+        index = stones.index(cell)
+        stones[index] = cell + offset
+        pushes.append(index * 4 + direction)
+    return pushes
+
+# Solve one level and write output/BDS/output-XX.txt
+def search(input_file, i, pushes=True, dead_squares=True, deadlocks=True, frontier='heap', budget=None, stats=None):
+    stats = (stats or Stats()).start()
+    try:
+        level = read_level(input_file, dead_squares, deadlocks, stats)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    output_directory = os.path.join('output', 'BDS')
+    os.makedirs(output_directory, exist_ok=True)
+    output_file = os.path.join(output_directory, f'output-{i:02d}.txt')
+
+    # The search is over pushes whatever pushes says: the pull side has no step moves
+    moves, weight = bidirectional(level, frontier, budget, stats)
+    solution = level.solution(moves, pushes=True) if moves is not None else None
+    stats.lap('reconstruct')
+    write_record(output_file, "BDS", stats, solution, weight, budget)
+
+def main():
+    parser = argparse.ArgumentParser(description='Bidirectional uniform-cost search over pushes')
+    add_search_arguments(parser, pushes=False, macros=False)
+    parser.add_argument('--frontier', choices=sorted(FRONTIERS), default='heap',
+                        help='open list implementation (default: heap)')
+    args = parser.parse_args()
+
+    for i in range(1, 11):
+        input_file = os.path.join('input', f'input-{i:02d}.txt')
+        search(input_file, i, *search_options(args), args.frontier)
+
+if __name__ == "__main__":
+    main()
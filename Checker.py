@@ -1,4 +1,31 @@
+"""Replay the solutions in output/ and check them against the levels.
+
+    python Checker.py                                  # every algorithm, input/input-*.txt
+    python Checker.py -a A,UCS 'generated/input-*.txt' --report report.csv
+
+Each level is parsed once into a src.replay.Board and all the outputs for
+it are replayed on that board together, spread over --jobs processes. A
+solution must replay without error, end with every stone on a switch, and
+match the Steps and Weight it reports. Problems are printed, --report
+writes one row per output as JSON or CSV, and the exit status is 1 if any
+output failed.
+"""
+
+import argparse
+import contextlib
+import csv
+import glob
+import io
+import json
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from src.replay import Board
+
+# Columns of the batch report
+REPORT_FIELDS = ('algorithm', 'level', 'output', 'status', 'steps', 'weight',
+                 'reported_steps', 'reported_weight', 'failing_step', 'error')
 
 def read_input_file(input_file):
     with open(input_file, 'r') as file:
@@ -20,153 +47,131 @@ def read_output_file(output_file):
     return solution
 
 def parse_grid(grid, weights):
-    stones = {}
-    switches = set()
-    walls = set()
-    player_pos = None
-    stone_index = 0
-
-    for i, row in enumerate(grid):
-        for j, cell in enumerate(row):
-            if cell == '@':
-                player_pos = (i, j)
-            elif cell == '$':
-                if stone_index < len(weights):
-                    stones[(i, j)] = weights[stone_index]
-                    stone_index += 1
-                else:
-                    print("Error: Not enough weights provided for all stones.")
-                    return None
-            elif cell == '.':
-                switches.add((i, j))
-            elif cell == '#':
-                walls.add((i, j))
-            # Handle cells that are both a switch and a stone
-            elif cell == '*':
-                if stone_index < len(weights):
-                    stones[(i, j)] = weights[stone_index]
-                    stone_index += 1
-                else:
-                    print("Error: Not enough weights provided for all stones.")
-                    return None
-                switches.add((i, j))
-
-    if stone_index != len(weights):
-        print("Error: Number of stones does not match number of weights.")
+    try:
+        return Board(weights, grid)
+    except ValueError as error:
+        print(f"Error: {error}")
         return None
 
-    return {
-        'player_pos': player_pos,
-        'stones': stones,
-        'switches': switches,
-        'walls': walls
-    }
-
-def simulate_solution(state, solution):
-    player_pos = state['player_pos']
-    stones = state['stones'].copy()
-    walls = state['walls']
-    switches = state['switches']
-    total_sum_weight = 0  # Sum of weights of stones pushed
-
-    # Define movement directions
-    move_offsets = {
-        'u': (-1, 0),
-        'd': (1, 0),
-        'l': (0, -1),
-        'r': (0, 1),
-        'U': (-1, 0),
-        'D': (1, 0),
-        'L': (0, -1),
-        'R': (0, 1)
-    }
-
-    for idx, move in enumerate(solution):
-        if move not in move_offsets:
-            print(f"Error: Invalid move '{move}' in solution at step {idx + 1}.")
-            return False, total_sum_weight
-        dx, dy = move_offsets[move]
-        new_x = player_pos[0] + dx
-        new_y = player_pos[1] + dy
-        new_pos = (new_x, new_y)
-
-        if new_pos in walls:
-            print(f"Error: Player walks into a wall at position {new_pos} at step {idx + 1}.")
-            return False, total_sum_weight
-
-        if new_pos in stones:
-            # There is a stone in the new position
-            stone_weight = stones[new_pos]
-            next_x = new_x + dx
-            next_y = new_y + dy
-            next_pos = (next_x, next_y)
-
-            if next_pos in walls or next_pos in stones:
-                print(f"Error: Cannot push stone from {new_pos} to {next_pos} at step {idx + 1}.")
-                return False, total_sum_weight
-
-            if move.islower():
-                print(f"Error: Attempted to push stone with lowercase move '{move}' at position {new_pos} at step {idx + 1}.")
-                return False, total_sum_weight
-
-            # Move the stone
-            stones[next_pos] = stones.pop(new_pos)
-            total_sum_weight += stone_weight
-
-        else:
-            if move.isupper():
-                print(f"Error: Attempted to push with uppercase move '{move}' but no stone at position {new_pos} at step {idx + 1}.")
-                return False, total_sum_weight
-
-        # Move the player
-        player_pos = new_pos
-
-    # After applying all moves, check if all stones are on switches
-    if set(stones.keys()) == switches:
-        return True, total_sum_weight
-    else:
-        print("Error: Not all stones are on switches at the end of the solution.")
-        return False, total_sum_weight
-
-def main():
-    # Directories
-    input_dir = 'input'
-    print("Algorithm: ", end="") 
-    alg = input()
-    output_dir = os.path.join('output', alg)
-
-    for i in range(1, 6):  
-        input_file = os.path.join(input_dir, f'input-{i:02d}.txt')
-        output_file = os.path.join(output_dir, f'output-{i:02d}.txt')
-
+def simulate_solution(board, solution):
+    valid, _, weight, failing = board.replay(solution)
+    if not valid:
+        print(f"Error: {board.describe(solution, failing)}")
+    return valid, weight
+
+def parse_record_line(line):
+    """(steps, weight) reported on the second line of an output file, or None."""
+    fields = dict(field.split(': ', 1) for field in line.strip().split(', ') if ': ' in field)
+    try:
+        return int(fields['Steps']), int(fields['Weight'])
+    except (KeyError, ValueError):
+        return None
 
-        # Check if files exist
-        if not os.path.isfile(input_file):
-            print(f"Error: Input file {input_file} does not exist.")
+def check_level(input_file, outputs):
+    """Check the outputs [(algorithm, output file)] of one level; returns one report row each.
+
+    The level is read and parsed once for all of them.
+    """
+    weights, grid = read_input_file(input_file)
+    with contextlib.redirect_stdout(io.StringIO()) as messages:
+        board = parse_grid(grid, weights)
+    rows = []
+    solutions = []
+    for algorithm, output_file in outputs:
+        row = {'algorithm': algorithm, 'level': input_file, 'output': output_file, 'status': 'ok',
+               'steps': None, 'weight': None, 'reported_steps': None, 'reported_weight': None,
+               'failing_step': None, 'error': ''}
+        rows.append(row)
+        if board is None:
+            row['status'], row['error'] = 'bad level', messages.getvalue().strip()
             continue
-        if not os.path.isfile(output_file):
-            print(f"Error: Output file {output_file} does not exist.")
+        with open(output_file, 'r') as file:
+            lines = file.read().split('\n')
+        if lines[0].startswith('No solution'):
+            row['status'] = 'no solution'
             continue
-
-        # Read the input and output files
-        weights, grid = read_input_file(input_file)
-        solution = read_output_file(output_file)
-
-        if solution is None:
-            print("Error reading solution from output file.")
+        if len(lines) < 3:
+            row['status'], row['error'] = 'invalid', 'Output file does not contain enough information.'
             continue
-
-        # Parse the grid to get initial state
-        state = parse_grid(grid, weights)
-        if state is None:
-            print("Error parsing the grid.")
+        reported = parse_record_line(lines[1])
+        if reported is not None:
+            row['reported_steps'], row['reported_weight'] = reported
+        solutions.append((row, lines[2].strip()))
+
+    # Every solution of the level is replayed on the same board
+    if solutions:
+        results = board.replay_all([solution for _, solution in solutions])
+        for (row, solution), (valid, steps, weight, failing) in zip(solutions, results):
+            row['steps'], row['weight'], row['failing_step'] = steps, weight, failing
+            if not valid:
+                row['status'], row['error'] = 'invalid', board.describe(solution, failing)
+            elif (row['reported_steps'], row['reported_weight']) != (steps, weight):
+                row['status'] = 'mismatch'
+                row['error'] = f'reported steps {row["reported_steps"]}, weight {row["reported_weight"]}'
+    return rows
+
+def find_tasks(input_patterns, output_dir, algorithms):
+    """Map every input-XX.txt matched by the patterns to its outputs under output_dir."""
+    if not algorithms:
+        algorithms = sorted(name for name in os.listdir(output_dir)
+                            if os.path.isdir(os.path.join(output_dir, name)))
+    input_files = sorted({filename for pattern in input_patterns for filename in glob.glob(pattern)})
+    tasks = []
+    for input_file in input_files:
+        match = re.search(r'input-(\d+)\.txt$', input_file)
+        if match is None:
             continue
-
-        is_valid, total_sum_weight = simulate_solution(state, solution)
-        if is_valid:
-            print(f"The solution in output-{i} is TRUE.")
+        outputs = [(algorithm, os.path.join(output_dir, algorithm, f'output-{int(match.group(1)):02d}.txt'))
+                   for algorithm in algorithms]
+        # Only levels that some algorithm has an output for
+        outputs = [(algorithm, output_file) for algorithm, output_file in outputs if os.path.isfile(output_file)]
+        if outputs:
+            tasks.append((input_file, outputs))
+    return tasks
+
+def write_report(rows, report):
+    """Write the rows as JSON or CSV, chosen by the extension of report."""
+    with open(report, 'w', newline='') as file:
+        if report.endswith('.csv'):
+            writer = csv.DictWriter(file, fieldnames=list(REPORT_FIELDS))
+            writer.writeheader()
+            writer.writerows(rows)
         else:
-            print(f"The solution in output-{i} is FALSE.")
+            json.dump(rows, file, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay the solutions in output/ and check them')
+    parser.add_argument('levels', nargs='*', default=[os.path.join('input', 'input-*.txt')],
+                        help='glob patterns of input files (default: input/input-*.txt)')
+    parser.add_argument('-a', '--algorithms', type=lambda text: [name for name in text.split(',') if name],
+                        help='comma-separated output directories to check (default: all of them)')
+    parser.add_argument('--output-dir', default='output', help='directory holding <ALG>/output-XX.txt (default: output)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='number of worker processes')
+    parser.add_argument('--report', help='write every result to this .json or .csv file')
+    args = parser.parse_args()
+
+    tasks = find_tasks(args.levels, args.output_dir, args.algorithms)
+    rows = []
+    if args.jobs <= 1:
+        for task in tasks:
+            rows.extend(check_level(*task))
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            # Levels go out in chunks, so thousands of small ones do not cost a round trip each
+            for level_rows in executor.map(check_level, *zip(*tasks), chunksize=max(1, len(tasks) // (4 * args.jobs))):
+                rows.extend(level_rows)
+
+    for row in rows:
+        if row['status'] not in ('ok', 'no solution'):
+            print(f"{row['algorithm']} {row['level']}: {row['status'].upper()} {row['error']}")
+    counts = {}
+    for row in rows:
+        counts[row['status']] = counts.get(row['status'], 0) + 1
+    print(f"Checked {len(rows)} outputs of {len(tasks)} levels: "
+          + ', '.join(f'{count} {status}' for status, count in sorted(counts.items())))
+    if args.report:
+        write_report(rows, args.report)
+    return 0 if all(row['status'] in ('ok', 'no solution') for row in rows) else 1
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
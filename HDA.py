@@ -0,0 +1,304 @@
+import argparse
+import os
+import queue as queues
+import time
+from multiprocessing import Array, Process, Queue, Value
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import psutil
+
+from src.budget import Budget
+from src.frontier import HeapFrontier
+from src.heuristic import HEURISTICS, INF
+from src.level import Level, load_distances, parse_level
+from src.options import add_search_arguments, search_options
+from src.stats import Stats, write_record
+
+# Expansions between two looks at the inbox, and successors per message
+EXPAND_BATCH = 64
+# Seconds between two termination checks of the coordinator
+POLL = 0.002
+# Seconds the coordinator waits for an answer of the workers before giving up
+ANSWER_TIMEOUT = 60.0
+# Weight of the best solution while none has been found
+NO_SOLUTION = (1 << 63) - 1
+# Per-worker slots of the shared counters: messages sent and received,
+# idle flag and nodes expanded
+SENT, RECEIVED, IDLE, EXPANDED, SLOTS = range(5)
+
+def hda(level, grid, pushes=False, dead_squares=True, deadlocks=True, heuristic='matching', workers=2, budget=None, stats=None):
+    """Hash-distributed A*: one A* per worker process, each owning the
+    states whose Zobrist key is equal to its number modulo workers.
+
+    A worker expands its own open states and sends every successor, in
+    batches, to the inbox of the worker owning it; the owner drops it if it
+    already has the state as cheaply and otherwise (re)opens it. Goals are
+    found when they arrive at their owner and lower the shared incumbent
+    weight. A worker is idle once no open state has f below the incumbent,
+    and the search ends when every worker is idle and every message sent
+    has been received, twice in a row. Nothing below the incumbent is open
+    then, so with an admissible heuristic the incumbent is optimal.
+
+    Every worker rebuilds the level from its weights and grid rows once at
+    start-up, and the push distance matrix of level is shared with all of
+    them through one block of shared memory; messages only carry states.
+    Returns (move codes, weight), or (None, None) if there is no solution.
+    Raises RuntimeError if a worker dies or stops answering.
+
+    The time, memory and cancel limits of budget are checked on every poll
+    of the coordinator, the memory one against the sum of the workers'
+    resident sizes.
+    """
+    budget = (budget or Budget()).start()
+    stats = stats or Stats().start()
+    distances = level.distances
+    shared = SharedMemory(create=True, size=max(distances.nbytes, 1))
+    np.ndarray(distances.shape, distances.dtype, buffer=shared.buf)[:] = distances
+    stats.lap('precompute')
+
+    start_player = level.search_space(pushes)[1]
+    start_key = level.hash(start_player, level.stones)
+    if level.is_goal(level.stones):
+        shared.close()
+        shared.unlink()
+        stats.lap('search')
+        stats.finish(level, 1)
+        return [], 0
+
+    inboxes = [Queue() for _ in range(workers)]
+    results = Queue()
+    counters = Array('q', SLOTS * workers, lock=False)
+    best = Value('q', NO_SOLUTION)
+    goal = Value('Q', 0)
+    processes = [
+        Process(target=worker, daemon=True,
+                args=(number, workers, level.weights, grid, dead_squares, deadlocks, pushes, heuristic,
+                      shared.name, distances.shape, distances.dtype.str, stats.memory,
+                      inboxes, results, counters, best, goal))
+        for number in range(workers)
+    ]
+    try:
+        for process in processes:
+            process.start()
+        inboxes[start_key % workers].put(('states', [(start_key, 0, start_player, level.stones, None, None)]))
+        sent = 1  # by the coordinator
+        watched = [psutil.Process(process.pid) for process in processes] if budget.memory_mb is not None else []
+
+        previous = None
+        while True:
+            time.sleep(POLL)
+            check_workers(processes)
+            expanded = sum(counters[number * SLOTS + EXPANDED] for number in range(workers))
+            if budget.exceeded(expanded) or budget.check(worker_memory(watched)):
+                break
+            snapshot = (all(counters[number * SLOTS + IDLE] for number in range(workers)),
+                        sent + sum(counters[number * SLOTS + SENT] for number in range(workers)),
+                        sum(counters[number * SLOTS + RECEIVED] for number in range(workers)))
+            if snapshot[0] and snapshot[1] == snapshot[2] and snapshot == previous:
+                break
+            previous = snapshot
+        stats.lap('search')
+
+        moves = None
+        weight = best.value
+        if not budget.reason and weight != NO_SOLUTION:
+            # Follow the parent pointers back to the start, asking each owner in turn
+            moves = []
+            key = goal.value
+            while key != start_key:
+                inboxes[key % workers].put(('parent', key))
+                key, move = answer(results, processes)
+                moves.append(move)
+            moves.reverse()
+
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        totals = [answer(results, processes) for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        shared.close()
+        shared.unlink()
+
+    # Counters summed over the workers; the memory is the sum of their peaks
+    stats.sample()
+    for total in totals:
+        for name in ('expanded', 'generated', 'duplicates', 'peak_frontier', 'closed', 'pruned', 'deadlocks',
+                     'peak_memory'):
+            setattr(stats, name, getattr(stats, name) + getattr(total, name))
+    if moves is None:
+        return None, None
+    return moves, weight
+
+def check_workers(processes):
+    """Raise RuntimeError if a worker process has died."""
+    for number, process in enumerate(processes):
+        if process.exitcode not in (None, 0):
+            raise RuntimeError(f'HDA* worker {number} exited with code {process.exitcode}')
+
+def answer(results, processes):
+    """Next message of the workers to the coordinator, as long as they are alive."""
+    deadline = time.time() + ANSWER_TIMEOUT
+    while True:
+        try:
+            return results.get(timeout=min(1.0, max(0.0, deadline - time.time())))
+        except queues.Empty:
+            check_workers(processes)
+            if time.time() >= deadline:
+                raise RuntimeError('HDA* workers stopped answering')
+
+def worker_memory(watched):
+    """Resident size in MB summed over the worker processes, or None if none are watched."""
+    if not watched:
+        return None
+    total = 0
+    for process in watched:
+        try:
+            total += process.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return total / (1024 * 1024)
+
+def worker(number, workers, weights, grid, dead_squares, deadlocks, pushes, heuristic,
+           shared_name, shape, dtype, memory, inboxes, results, counters, best, goal):
+    """A* over the states owned by worker number; see hda()."""
+    level = Level(weights, grid, dead_squares, deadlocks)
+    shared = SharedMemory(name=shared_name)
+    level._distances = np.ndarray(shape, np.dtype(dtype), buffer=shared.buf)
+    get_heuristic = HEURISTICS[heuristic](level)
+    expand = level.search_space(pushes)[0]
+    stats = Stats(memory).start()
+    inbox = inboxes[number]
+    base = number * SLOTS
+
+    queue = HeapFrontier()
+    states = {}  # key -> (player, stones, h) of the open and closed states
+    g_score = {}
+    parents = {}  # key -> (parent key, move)
+    outboxes = [[] for _ in range(workers)]
+
+    def receive(key, g, player, stones, parent, move):
+        if key in g_score and g >= g_score[key]:
+            stats.duplicates += 1
+            return
+        g_score[key] = g
+        parents[key] = (parent, move)
+        if level.is_goal(stones):
+            with best.get_lock():
+                if g < best.value:
+                    best.value = g
+                    goal.value = key
+            return
+        h = get_heuristic(stones)
+        if h == INF:  # Some stone can no longer reach a free switch
+            return
+        states[key] = (player, stones, h)
+        queue.push(key, g + h, g)
+
+    def flush():
+        for owner, batch in enumerate(outboxes):
+            if batch:
+                counters[base + SENT] += 1
+                inboxes[owner].put(('states', batch))
+                outboxes[owner] = []
+
+    def handle(message):
+        if message[0] == 'states':
+            counters[base + IDLE] = 0
+            for entry in message[1]:
+                receive(*entry)
+            counters[base + RECEIVED] += 1
+        elif message[0] == 'parent':
+            results.put(parents[message[1]])
+        else:
+            return False
+        return True
+
+    running = True
+    while running:
+        # Take in every batch that has arrived
+        try:
+            while running:
+                running = handle(inbox.get_nowait())
+        except queues.Empty:
+            pass
+        if not running:
+            break
+
+        for _ in range(EXPAND_BATCH):
+            if not queue:
+                break
+            key, g = queue.pop()
+            player, stones, h = states[key]
+            if g + h >= best.value:
+                queue.push(key, g + h, g)  # Open again if a cheaper path turns up
+                break
+            stats.expand(len(queue) + 1)
+            counters[base + EXPANDED] = stats.expanded
+            successors = expand(player, stones, key)
+            stats.generated += len(successors)
+            for move, new_player, new_stones, cost, new_key in successors:
+                owner = new_key % workers
+                if owner == number:
+                    receive(new_key, g + cost, new_player, new_stones, key, move)
+                else:
+                    outboxes[owner].append((new_key, g + cost, new_player, new_stones, key, move))
+                    if len(outboxes[owner]) >= EXPAND_BATCH:
+                        flush()
+        flush()
+
+        if not queue or queue.heap[0][0] >= best.value:
+            # Nothing worth expanding: wait for work
+            counters[base + IDLE] = 1
+            try:
+                running = handle(inbox.get(timeout=POLL))
+            except queues.Empty:
+                pass
+
+    stats.finish(level, len(g_score))
+    results.put(stats)
+    shared.close()
+
+# Solve one level and write output/HDA/output-XX.txt
+def search(filename, id, pushes=False, dead_squares=True, deadlocks=True, heuristic='matching', workers=os.cpu_count(), budget=None, stats=None):
+    stats = (stats or Stats()).start()
+    try:
+        weights, grid = parse_level(filename)
+        level = Level(weights, grid, dead_squares, deadlocks)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    stats.lap('parse')
+    load_distances(level, filename)
+
+    output_dir = os.path.join('output', 'HDA')
+    os.makedirs(output_dir, exist_ok=True)
+    output_filename = os.path.join(output_dir, f'output-{id:02d}.txt')
+
+    try:
+        moves, weight = hda(level, grid, pushes, dead_squares, deadlocks, heuristic, workers, budget, stats)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        return
+    solution = level.solution(moves, pushes) if moves is not None else None
+    stats.lap('reconstruct')
+    write_record(output_filename, 'HDA*', stats, solution, weight, budget)
+
+def main():
+    parser = argparse.ArgumentParser(description='Hash-distributed parallel A* search')
+    add_search_arguments(parser, macros=False, heuristic=True)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help=f'number of worker processes (default: {os.cpu_count()})')
+    args = parser.parse_args()
+
+    for id in range(1, 11):
+        input_filename = os.path.join('input', f'input-{id:02d}.txt')
+        print(f"Processing {input_filename}")
+        search(input_filename, id, *search_options(args), args.heuristic, args.workers)
+
+if __name__ == "__main__":
+    main()
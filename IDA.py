@@ -0,0 +1,123 @@
+import argparse
+import os
+
+from src.budget import Budget
+from src.heuristic import HEURISTICS, INF
+from src.level import read_level
+from src.options import add_search_arguments, search_options
+from src.stats import Stats, write_record
+from src.transposition import DEFAULT_BITS, TranspositionTable
+
+def ida(level, pushes=False, heuristic='matching', table_bits=DEFAULT_BITS, budget=None, stats=None):
+    """Iterative deepening A* on f = weight so far + heuristic.
+
+    Each iteration is a depth-first search that cuts off states whose f is
+    above the bound; the next bound is the smallest f that was cut off.
+    Memory is the current path plus a fixed-size transposition table, which
+    drops states already reached as cheaply in this iteration. States on
+    the current path are skipped too, so the zero-cost walks of a step-level
+    search cannot loop.
+
+    Returns (move codes, weight), or (None, None) if there is no solution.
+    """
+    budget = (budget or Budget()).start()
+    stats = stats or Stats().start()
+    get_heuristic = HEURISTICS[heuristic](level)
+    table = TranspositionTable(table_bits)
+    stats.lap('precompute')
+
+    expand, start_player = level.search_space(pushes)
+    start_key = level.hash(start_player, level.stones)
+
+    bound = get_heuristic(level.stones)
+    result = None, None
+    while bound < INF and result[0] is None and not budget.reason:
+        table.new_iteration()
+        table.visit(start_key, 0)
+        result, bound = probe(level, expand, get_heuristic, table, bound,
+                              start_player, start_key, budget, stats)
+
+    stats.lap('search')
+    stats.finish(level, len(table))
+    return result
+
+def probe(level, expand, get_heuristic, table, bound, player, key, budget, stats):
+    """One depth-first iteration below bound.
+
+    Returns ((moves, weight), next bound), where moves is None if no goal
+    was found and the next bound is INF if nothing was cut off.
+    """
+    if level.is_goal(level.stones):
+        return ([], 0), bound
+    next_bound = INF
+    moves = []
+    on_path = {key}
+    # Frames of the current path: successors, index of the next one, g, key
+    stats.expand(1)
+    frames = [[expand(player, level.stones, key), 0, 0, key]]
+    stats.generated += len(frames[0][0])
+    while frames:
+        frame = frames[-1]
+        successors, index, g, key = frame
+        if index == len(successors):
+            frames.pop()
+            on_path.discard(key)
+            if moves:
+                moves.pop()
+            continue
+        frame[1] += 1
+
+        move, new_player, new_stones, cost, new_key = successors[index]
+        new_g = g + cost
+        if new_key in on_path or not table.visit(new_key, new_g):
+            stats.duplicates += 1
+            continue
+        h = get_heuristic(new_stones)
+        if new_g + h > bound:
+            next_bound = min(next_bound, new_g + h)
+            continue
+
+        moves.append(move)
+        if level.is_goal(new_stones):
+            return (moves, new_g), bound
+        if budget.exceeded(stats.expanded):
+            return (None, None), INF
+        stats.expand(len(frames))
+        successors = expand(new_player, new_stones, new_key)
+        stats.generated += len(successors)
+        frames.append([successors, 0, new_g, new_key])
+        on_path.add(new_key)
+    return (None, None), next_bound
+
+# Solve one level and write output/IDA/output-XX.txt
+def search(filename, id, pushes=False, dead_squares=True, deadlocks=True, heuristic='matching', table_bits=DEFAULT_BITS, macros=(), budget=None, stats=None):
+    stats = (stats or Stats()).start()
+    try:
+        level = read_level(filename, dead_squares, deadlocks, stats, macros)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    output_dir = os.path.join('output', 'IDA')
+    os.makedirs(output_dir, exist_ok=True)
+    output_filename = os.path.join(output_dir, f'output-{id:02d}.txt')
+
+    moves, weight = ida(level, pushes, heuristic, table_bits, budget, stats)
+    solution = level.solution(moves, pushes) if moves is not None else None
+    stats.lap('reconstruct')
+    write_record(output_filename, 'IDA*', stats, solution, weight, budget)
+
+def main():
+    parser = argparse.ArgumentParser(description='Iterative deepening A* search')
+    add_search_arguments(parser, heuristic=True)
+    parser.add_argument('--table-bits', type=int, default=DEFAULT_BITS,
+                        help=f'transposition table of 2^BITS entries (default: {DEFAULT_BITS})')
+    args = parser.parse_args()
+
+    for id in range(1, 11):
+        input_filename = os.path.join('input', f'input-{id:02d}.txt')
+        print(f"Processing {input_filename}")
+        search(input_filename, id, *search_options(args), args.heuristic, args.table_bits, args.macros)
+
+if __name__ == "__main__":
+    main()
@@ -1,170 +1,90 @@
-import heapq
-import time
-import sys
-
-class State:
-    def __init__(self, walls, stones, switches, player, move, sum_weight, weights):
-        self.walls = walls
-        self.stones = stones  
-        self.switches = switches
-        self.player = player
-        self.move = move
-        self.sum_weight = sum_weight
-        self.weights = weights  
-
-    def getNeighbors(self):
-        x, y = self.player
-        self.neighbors = []  
-
-        self.movePlayer(x - 1, y, x - 2, y, "u")
-        self.movePlayer(x + 1, y, x + 2, y, "d")
-        self.movePlayer(x, y - 1, x, y - 2, "l")
-        self.movePlayer(x, y + 1, x, y + 2, "r")
-
-        return self.neighbors
-
-    def movePlayer(self, ax, ay, bx, by, direction):
-        attempt = (ax, ay)
-        newstone = (bx, by)
-        if attempt not in self.walls:
-            if attempt not in self.stones or (newstone not in self.stones and newstone not in self.walls):
-                if attempt in self.stones:
-                    stones_copy = self.stones.copy()
-                    weight = stones_copy[attempt]
-                    del stones_copy[attempt]
-                    stones_copy[newstone] = weight
-                    sum_weight = self.sum_weight + weight
-                    self.neighbors.append(State(
-                        self.walls,
-                        stones_copy,
-                        self.switches,
-                        attempt,
-                        self.move + direction.upper(),
-                        sum_weight,
-                        self.weights
-                    ))
-                else:
-                    sum_weight = self.sum_weight
-                    self.neighbors.append(State(
-                        self.walls,
-                        self.stones.copy(),
-                        self.switches,
-                        attempt,
-                        self.move + direction,
-                        sum_weight,
-                        self.weights
-                    ))
-
-    def reachedGoal(self):
-        return all(stone in self.switches for stone in self.stones)
-
-    def getMove(self):
-        return self.move
-
-    def __hash__(self):
-        # Hash based on player position and stones with their weights
-        return hash((self.player, frozenset(self.stones.items())))
-
-    def __eq__(self, other):
-        return self.player == other.player and self.stones == other.stones
-
-    def __lt__(self, other):
-        # Prioritize smaller sum_weight in heapq
-        if self.sum_weight != other.sum_weight:
-            return self.sum_weight < other.sum_weight
-        else:
-            # Tie-breaker based on move length
-            return len(self.move) < len(other.move)
+import argparse
+import os
+from functools import partial
+
+from src.budget import Budget
+from src.cache import SolutionCache
+from src.frontier import FRONTIERS, DialFrontier
+from src.level import read_level
+from src.options import add_search_arguments, search_options
+from src.stats import Stats, write_record
+from src.tree import ROOT, SearchTree
 
 class UCS:
-    def __init__(self, start_state):
-        self.start_state = start_state
+    def __init__(self, level, pushes=False, frontier='dial', budget=None, stats=None):
+        self.level = level
+        self.pushes = pushes
+        self.frontier = frontier
+        self.budget = budget or Budget()
+        self.stats = stats or Stats().start()
 
     def ucs(self):
-        pq = []
-        heapq.heappush(pq, (self.start_state.sum_weight, self.start_state))
-        costs = {}
-        start_time = time.time()
-        max_memory = 0
-        cnt_node = 0
+        # Open list of state keys; the states themselves are kept in states
+        # as (player, stones, node), node being their place in the tree
+        level = self.level
+        expand, start_player = level.search_space(self.pushes)
+        start_key = level.hash(start_player, level.stones)
+        if self.frontier == 'dial':
+            pq = DialFrontier(max(level.weights, default=0))
+        else:
+            pq = FRONTIERS[self.frontier]()
+        pq.push(start_key, 0, 0)
+        tree = SearchTree()
+        states = {start_key: (start_player, level.stones, ROOT)}
+        costs = {start_key: 0}
+        budget = self.budget.start()
+        stats = self.stats
         while pq:
-            cnt_node += 1
-            cost, current_state = heapq.heappop(pq)
-            if current_state in costs and costs[current_state] <= cost:
-                continue
-            costs[current_state] = cost
-            if current_state.reachedGoal():
-                total_time = (time.time() - start_time) * 1000
-                return current_state.getMove(), current_state.sum_weight, total_time, max_memory, cnt_node
-            for neighbor in current_state.getNeighbors():
-                neighbor_cost = neighbor.sum_weight
-                if neighbor not in costs or neighbor_cost < costs.get(neighbor, float('inf')):
-                    heapq.heappush(pq, (neighbor_cost, neighbor))
-            current_memory = sys.getsizeof(pq) + sys.getsizeof(costs)
-            max_memory = max(max_memory, current_memory)
-        total_time = (time.time() - start_time) * 1000
-        return None, float("inf"), total_time, max_memory
-
-def Search(file_path, id_file):
-    with open(file_path, 'r') as file:
-        # Read the first line (weights of the stones)
-        weights_line = file.readline().strip()
-        weights = list(map(int, weights_line.split()))
-        # Read the rest of the lines (Sokoban grid)
-        grid = [list(line.rstrip()) for line in file.readlines()]
-    
-    stones = {}
-    switches = set()
-    walls = set()
-    player = None
-    stone_index = 0  # To assign weights to stones
-
-    # Traverse the grid and add positions to respective sets
-    for i in range(len(grid)):
-        for j in range(len(grid[i])):
-            if grid[i][j] == '$':
-                if stone_index < len(weights):
-                    stones[(i, j)] = weights[stone_index]
+            if budget.exceeded(stats.expanded):
+                break
+            stats.expand(len(pq))
+            key, cost = pq.pop()
+            player, stones, node = states.pop(key)
+            if level.is_goal(stones):
+                stats.lap('search')
+                solution = level.solution(tree.path(node), self.pushes)
+                stats.lap('reconstruct')
+                stats.finish(level, len(costs))
+                return solution, cost
+            successors = expand(player, stones, key)
+            stats.generated += len(successors)
+            for direction, new_player, new_stones, weight, new_key in successors:
+                new_cost = cost + weight
+                if new_key not in costs or new_cost < costs[new_key]:
+                    costs[new_key] = new_cost
+                    states[new_key] = (new_player, new_stones, tree.add(node, direction))
+                    pq.push(new_key, new_cost, new_cost)
                 else:
-                    print("Error: Not enough weights provided for all stones.")
-                    return
-                stone_index += 1
-            elif grid[i][j] == '.':
-                switches.add((i, j))
-            elif grid[i][j] == '#':
-                walls.add((i, j))
-            elif grid[i][j] == '@':
-                player = (i, j)
-            elif grid[i][j] == '*':
-                switches.add((i, j))
-                if stone_index < len(weights):
-                    stones[(i, j)] = weights[stone_index]
-                else:
-                    print("Error: Not enough weights provided for all stones.")
-                    return
-                stone_index += 1
-
-    if stone_index != len(weights):
-        print("Error: Number of stones does not match number of weights.")
+                    stats.duplicates += 1
+        stats.lap('search')
+        stats.finish(level, len(costs))
+        return None, float("inf")
+
+def Search(file_path, id_file, pushes=False, dead_squares=True, deadlocks=True, frontier='dial', macros=(), budget=None, stats=None):
+    stats = (stats or Stats()).start()
+    try:
+        level = read_level(file_path, dead_squares, deadlocks, stats, macros)
+    except ValueError as e:
+        print(f"Error: {e}")
         return
 
-    start_state = State(walls, stones, switches, player, "", 0, weights)
-
     # Run UCS
-    ucs_solver = UCS(start_state)
-    solution, sum_weight, total_time, max_memory, cnt_node = ucs_solver.ucs()
-    with open(f"output/UCS/output-{id_file:02d}.txt", "w") as file:
-        if solution:
-            file.write("UCS\n")
-            file.write(f"Steps: {len(solution)}, Weight: {sum_weight}, Node: {cnt_node}, Time (ms): {total_time:.2f}, Memory (MB): {max_memory / 1048576:.2f}\n")
-            file.write(str(solution) + "\n")
-        else:
-            file.write("No solution found.\n")
+    ucs_solver = UCS(level, pushes, frontier, budget, stats)
+    solution, sum_weight = ucs_solver.ucs()
+    os.makedirs("output/UCS", exist_ok=True)
+    write_record(f"output/UCS/output-{id_file:02d}.txt", "UCS", stats, solution, sum_weight, ucs_solver.budget)
 
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Uniform-cost search')
+    add_search_arguments(parser, cache=True)
+    parser.add_argument('--frontier', choices=['dial'] + sorted(FRONTIERS), default='dial',
+                        help='open list implementation (default: dial)')
+    args = parser.parse_args()
+
+    solve = partial(SolutionCache(args.cache).run, 'UCS', Search) if args.cache else Search
     for i in range(1,11):  # Loop from 1 to 5
         file_path = f"input/input-{i:02d}.txt"  # Construct the file path dynamically
-        Search(file_path, i)  # Call the Search function with the file path
+        solve(file_path, i, *search_options(args), args.frontier, args.macros)  # Call the Search function with the file path
 
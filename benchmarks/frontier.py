@@ -0,0 +1,96 @@
+"""Micro-benchmark of the A* open lists.
+
+Records the push/pop sequence of an A* run (step moves, Manhattan
+heuristic, no pruning, so the open list gets large) and replays it against
+queue.PriorityQueue of State objects, as A.py used to do, and against the
+frontiers in src/frontier.py.
+
+Run from the repository root:  python -m benchmarks.frontier [input file]
+"""
+
+import sys
+import time
+from dataclasses import dataclass
+from queue import PriorityQueue
+
+from src.frontier import FRONTIERS
+from src.heuristic import ManhattanHeuristic
+from src.level import read_level
+
+
+@dataclass(eq=False)
+class State:
+    key: int
+    g: int
+    f: int
+
+    def __lt__(self, other):
+        if self.f != other.f:
+            return self.f < other.f
+        return self.g < other.g
+
+
+def record(level):
+    """Run A* and return its operations: (key, f, g) pushes and None pops."""
+    heuristic = ManhattanHeuristic(level)
+    frontier = FRONTIERS['heap']()
+    start = level.hash(level.player, level.stones)
+    states = {start: (level.player, level.stones)}
+    g_score = {start: 0}
+    trace = [(start, heuristic(level.stones), 0)]
+    frontier.push(*trace[0])
+    while frontier:
+        key, g = frontier.pop()
+        trace.append(None)
+        player, stones = states[key]
+        if level.is_goal(stones):
+            break
+        for _, new_player, new_stones, cost, new_key in level.successors(player, stones, key):
+            new_g = g + cost
+            if new_key in g_score and new_g >= g_score[new_key]:
+                continue
+            g_score[new_key] = new_g
+            states[new_key] = (new_player, new_stones)
+            push = (new_key, new_g + heuristic(new_stones), new_g)
+            frontier.push(*push)
+            trace.append(push)
+    return trace
+
+
+def replay_priority_queue(trace):
+    queue = PriorityQueue()
+    for op in trace:
+        if op is None:
+            queue.get()
+        else:
+            key, f, g = op
+            queue.put(State(key, g, f))
+
+
+def replay_frontier(trace, name):
+    frontier = FRONTIERS[name]()
+    for op in trace:
+        if op is None:
+            frontier.pop()
+        else:
+            frontier.push(*op)
+
+
+def main():
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'input/input-04.txt'
+    level = read_level(filename, dead_squares=False, deadlocks=False)
+    trace = record(level)
+    pops = trace.count(None)
+    print(f'{filename}: {len(trace) - pops} pushes, {pops} pops')
+
+    runs = [('PriorityQueue', lambda: replay_priority_queue(trace))]
+    for name in FRONTIERS:
+        runs.append((name, lambda name=name: replay_frontier(trace, name)))
+    for name, run in runs:
+        start = time.perf_counter()
+        run()
+        print(f'{name:>14}: {(time.perf_counter() - start) * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Speed-up of hash-distributed A* with the number of worker processes.
+
+Solves input-04 and the larger generated stress levels with A.py's A* and
+with HDA.py's HDA* for every worker count given, and prints the search time
+of each with its speed-up over A* and the nodes expanded. HDA* expands more
+nodes than A*, because a worker may expand states that a global open list
+would never have reached, and every successor owned by another worker
+costs a trip through a queue. Its speed-up is therefore below the worker
+count, and it can only show on a machine with that many free cores.
+
+Run from the repository root:  python -m benchmarks.hda [worker counts]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import A
+import HDA
+from benchmarks.solvers import write_stress_levels
+from src.stats import Stats
+
+LEVELS = ['input-04', 'stress-03', 'stress-04', 'gen-02', 'gen-04']
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [1, 2, 4, 8]
+    stress_dir = tempfile.mkdtemp(prefix='stress-')
+    workdir = tempfile.mkdtemp(prefix='hda-')
+    levels = [(4, 'input-04', os.path.abspath(os.path.join('input', 'input-04.txt')))]
+    levels += [level for level in write_stress_levels(stress_dir) if level[1] in LEVELS]
+    cwd = os.getcwd()
+    os.chdir(workdir)  # the solvers write output/<ALG>/output-XX.txt
+    try:
+        print(f"{os.cpu_count()} cores")
+        print(f"{'level':>10} {'A* ms':>9} " + ' '.join(f'{f"HDA*-{count} ms":>13} {"x":>5}' for count in counts))
+        for level_id, name, filename in levels:
+            stats = Stats(memory=False)
+            A.search(filename, level_id, stats=stats)
+            baseline = stats.time_ms
+            row = [f'{name:>10} {baseline:>9.1f}']
+            nodes = [stats.expanded]
+            for count in counts:
+                HDA.search(filename, level_id, workers=count, stats=stats)
+                row.append(f'{stats.time_ms:>13.1f} {baseline / stats.time_ms:>5.2f}')
+                nodes.append(stats.expanded)
+            print(' '.join(row) + '   nodes ' + '/'.join(map(str, nodes)))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        shutil.rmtree(stress_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""Benchmark of the solvers with regression tracking.
+
+Runs every algorithm on every level --repeat times and records the median
+and p95 search time, the nodes expanded and the peak memory in a JSON file.
+The levels are the shipped ones plus two sets of generated stress levels,
+to show how the solvers scale. The first set is open rooms that get larger
+and hold more stones. The second set is random levels from src/generator.py
+with fixed seeds.
+
+Every (algorithm, level) pair runs in a fresh worker process inside a
+scratch directory. The resident set size then belongs to that search
+alone, and output/ is left untouched. The results are compared with a
+stored baseline. Any time, node or memory figure that got worse by more
+than --threshold is reported, and the exit status is 1. Entries that are
+missing from the baseline, such as a newly added solver, are listed as
+unchecked.
+
+Run from the repository root:
+
+    python -m benchmarks.solvers                       # everything, 5 runs each
+    python -m benchmarks.solvers -a A,UCS 4 9 --repeat 10
+    python -m benchmarks.solvers --save-baseline       # accept the current numbers
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from solve import ALGORITHMS, find_levels, parse_algorithms
+from src.budget import Budget
+from src.generator import generate
+from src.level import read_level
+from src.stats import Stats, read_record
+
+BASELINE = os.path.join('benchmarks', 'baseline.json')
+RESULTS = os.path.join('benchmarks', 'results.json')
+
+# (width, height, stones) of the generated stress levels, walls included
+STRESS = [(10, 7, 2), (12, 7, 2), (14, 9, 3), (16, 9, 3)]
+STRESS_ID = 101  # output file number of the first stress level
+
+# Parameters of the random stress levels, recorded in the results file
+GENERATED = [
+    {'width': 10, 'height': 8, 'stones': 3, 'seed': 1},
+    {'width': 12, 'height': 9, 'stones': 3, 'seed': 2},
+    {'width': 14, 'height': 10, 'stones': 4, 'seed': 3},
+    {'width': 16, 'height': 12, 'stones': 4, 'seed': 4},
+]
+GENERATED_ID = 201
+
+# Time differences below this are noise, whatever the threshold says
+NOISE_MS = 10.0
+
+
+def stress_level(width, height, stones):
+    """Text of an open room with a column of stones on the left and of switches on the right.
+
+    The stones sit on every other row and each one is pushed straight across
+    the room. The room size sets the number of player cells and the stone
+    count sets the number of stone combinations.
+    """
+    if stones > (height - 3) // 2:
+        raise ValueError(f'a {height} rows high room holds at most {(height - 3) // 2} stones')
+    rows = [['#'] + [' '] * (width - 2) + ['#'] for _ in range(height)]
+    rows[0] = rows[-1] = ['#'] * width
+    for index in range(stones):
+        row = 2 + 2 * index
+        rows[row][2] = '$'
+        rows[row][width - 3] = '.'
+    rows[1][1] = '@'
+    weights = [index % 5 + 1 for index in range(stones)]
+    return ' '.join(map(str, weights)) + '\n' + '\n'.join(''.join(row) for row in rows) + '\n'
+
+
+def write_stress_levels(directory):
+    """Write the stress levels into directory and return their (id, name, file) triples."""
+    texts = [(STRESS_ID + number, f'stress-{number + 1:02d}', stress_level(*size))
+             for number, size in enumerate(STRESS)]
+    texts += [(GENERATED_ID + number, f'gen-{number + 1:02d}', generate(**params))
+              for number, params in enumerate(GENERATED)]
+    levels = []
+    for level_id, name, text in texts:
+        filename = os.path.join(directory, f'{name}.txt')
+        with open(filename, 'w') as file:
+            file.write(text)
+        read_level(filename)  # cache the push distances once instead of in every worker
+        levels.append((level_id, name, filename))
+    return levels
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered) + 0.5) - 1))]
+
+
+def measure(algorithm, filename, level_id, repeat, budget):
+    """Solve one level repeat times in a scratch directory and summarize the runs.
+
+    A run that breaks the budget is not repeated.
+    """
+    workdir = tempfile.mkdtemp(prefix='bench-')
+    try:
+        os.chdir(workdir)
+        stats = Stats()
+        times = []
+        memory = 0.0
+        for _ in range(repeat):
+            ALGORITHMS[algorithm](filename, level_id, budget=budget, stats=stats)
+            times.append(stats.time_ms)
+            memory = max(memory, stats.memory_mb)
+            if budget.reason:  # Another run would only hit the limit again
+                break
+        solved, weight = read_record(os.path.join('output', algorithm, f'output-{level_id:02d}.txt'))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        'time_ms': {'median': round(statistics.median(times), 3), 'p95': round(percentile(times, 0.95), 3)},
+        'nodes': stats.expanded,
+        'generated': stats.generated,
+        'memory_mb': round(memory, 2),
+        'solved': solved,
+        'weight': weight,
+    }
+
+
+def compare(results, baseline, threshold):
+    """List (entry, metric, baseline value, new value) for everything that got worse."""
+    regressions = []
+    for entry, new in results.items():
+        old = baseline.get(entry)
+        # Runs cut short by the budget only measure the budget
+        if old is None or not old['solved']:
+            continue
+        if not new['solved']:
+            regressions.append((entry, 'solved', True, False))
+            continue
+        checks = [
+            ('time_ms', old['time_ms']['median'], new['time_ms']['median'], NOISE_MS),
+            ('nodes', old['nodes'], new['nodes'], 0),
+            ('memory_mb', old['memory_mb'], new['memory_mb'], 0),
+        ]
+        for metric, before, after, noise in checks:
+            if after > before * (1 + threshold) and after - before > noise:
+                regressions.append((entry, metric, before, after))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Sokoban solvers')
+    parser.add_argument('levels', nargs='*',
+                        help='level ids or glob patterns of input files (default: input/input-*.txt)')
+    parser.add_argument('-a', '--algorithms', type=parse_algorithms, default=sorted(ALGORITHMS),
+                        help=f"comma-separated algorithms out of {', '.join(sorted(ALGORITHMS))} (default: all)")
+    parser.add_argument('-n', '--repeat', type=int, default=5, help='runs per algorithm and level (default: 5)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='worker processes; more than 1 makes the timings noisier')
+    parser.add_argument('--no-stress', action='store_true', help='skip the generated stress levels')
+    parser.add_argument('--time-limit', type=float, default=10, metavar='SECONDS',
+                        help='wall-clock budget per search (default: 10)')
+    parser.add_argument('--output', default=RESULTS, help=f'results file (default: {RESULTS})')
+    parser.add_argument('--baseline', default=BASELINE, help=f'baseline file (default: {BASELINE})')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown reported as a regression (default: 0.2)')
+    parser.add_argument('--save-baseline', action='store_true', help='also write the results as the new baseline')
+    args = parser.parse_args()
+
+    levels = [(level_id, os.path.splitext(os.path.basename(filename))[0], os.path.abspath(filename))
+              for level_id, filename in find_levels(args.levels)]
+    stress_dir = tempfile.mkdtemp(prefix='stress-')
+    if not args.no_stress:
+        levels += write_stress_levels(stress_dir)
+    budget = Budget(time_ms=args.time_limit * 1000)
+
+    tasks = [(algorithm, name, filename, level_id)
+             for level_id, name, filename in levels
+             for algorithm in args.algorithms]
+    results = {}
+    try:
+        # One fresh process per task, so each peak memory figure is that search's own
+        with ProcessPoolExecutor(max_workers=args.jobs, max_tasks_per_child=1) as executor:
+            futures = [(f'{algorithm}/{name}', executor.submit(measure, algorithm, filename, level_id, args.repeat, budget))
+                       for algorithm, name, filename, level_id in tasks]
+            for entry, future in futures:
+                result = results[entry] = future.result()
+                print(f"{entry:<16} median {result['time_ms']['median']:10.2f} ms"
+                      f"  p95 {result['time_ms']['p95']:10.2f} ms  nodes {result['nodes']:>8}"
+                      f"  memory {result['memory_mb']:7.2f} MB" + ('' if result['solved'] else '  (unsolved)'))
+    finally:
+        shutil.rmtree(stress_dir, ignore_errors=True)
+
+    report = {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'repeat': args.repeat,
+        'generated': GENERATED,
+        'results': results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f'Baseline saved to {args.baseline}')
+        return
+
+    try:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+    except OSError:
+        print(f'No baseline at {args.baseline}; run with --save-baseline to create one')
+        return
+    # Entries the baseline does not know are not checked; say so rather than pass them
+    missing = [entry for entry in results if entry not in baseline]
+    for entry in missing:
+        print(f'NO BASELINE {entry}; run with --save-baseline to record it')
+    regressions = compare(results, baseline, args.threshold)
+    for entry, metric, before, after in regressions:
+        print(f'REGRESSION {entry} {metric}: {before} -> {after}')
+    if regressions:
+        sys.exit(1)
+    unchecked = f', {len(missing)} entries unchecked' if missing else ''
+    print(f'No regressions against {args.baseline} (threshold {args.threshold:.0%}){unchecked}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Nodes expanded by A* under each tie-breaking policy of the heap.
+
+Runs A.py's search on the shipped levels once per policy in TIE_BREAKS,
+with the default pruning and heuristic and again with the Manhattan
+heuristic and no pruning (the configuration with the largest plateaus),
+and prints a table of expansions and the total time.
+
+Run from the repository root:  python -m benchmarks.tiebreak [level ids]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import A
+from src.frontier import TIE_BREAKS
+from src.stats import Stats
+
+CONFIGURATIONS = [
+    ('matching, pruning', {}),
+    ('manhattan, no pruning', {'heuristic': 'manhattan', 'dead_squares': False, 'deadlocks': False}),
+]
+
+
+def main():
+    ids = [int(arg) for arg in sys.argv[1:]] or list(range(1, 11))
+    levels = [(id, os.path.abspath(os.path.join('input', f'input-{id:02d}.txt'))) for id in ids]
+    workdir = tempfile.mkdtemp(prefix='tiebreak-')
+    cwd = os.getcwd()
+    os.chdir(workdir)  # A.search writes output/A/output-XX.txt
+    try:
+        stats = Stats(memory=False)
+        for title, options in CONFIGURATIONS:
+            print(f'{title}')
+            print(f"{'policy':>8} " + ' '.join(f'{id:>7}' for id, _ in levels) + f"{'total':>9} {'ms':>9}")
+            for policy in TIE_BREAKS:
+                nodes = []
+                elapsed = 0.0
+                for id, filename in levels:
+                    A.search(filename, id, tie_break=policy, stats=stats, **options)
+                    nodes.append(stats.expanded)
+                    elapsed += stats.time_ms
+                print(f'{policy:>8} ' + ' '.join(f'{count:>7}' for count in nodes)
+                      + f'{sum(nodes):>9} {elapsed:>9.1f}')
+            print()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Generate random solvable levels for the solvers and the benchmark.
+
+    python generate.py --width 12 --height 9 --stones 4 --count 5
+    python generate.py --width 20 --height 14 --stones 6 --weights 1-20 --seed 7
+    python generate.py --params generated/input-103.json   # rebuild level 103
+
+Each level is written as <directory>/input-XX.txt in the same format as the
+shipped levels, starting at --first-id. Its parameters go to input-XX.json
+next to it, so it can be rebuilt exactly. Numbering starts at 101 so that
+solving generated levels never overwrites output/<ALG>/output-01..10.txt:
+
+    python solve.py -a A 'generated/input-*.txt'
+    python -m benchmarks.solvers 'generated/input-*.txt'
+"""
+
+import argparse
+import json
+import os
+import re
+
+from src.generator import VERSION, generate
+
+FIRST_ID = 101
+
+
+def parse_weights(text):
+    low, _, high = text.partition('-')
+    try:
+        return int(low), int(high or low)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'weights must look like 1-9, not {text}')
+
+
+def write_level(directory, level_id, params):
+    """Generate the level described by params into directory; returns the file name."""
+    text = generate(params['width'], params['height'], params['stones'], tuple(params['weights']),
+                    params['seed'], params['walls'], params['pulls'])
+    os.makedirs(directory, exist_ok=True)
+    filename = os.path.join(directory, f'input-{level_id:02d}.txt')
+    with open(filename, 'w') as file:
+        file.write(text)
+    with open(os.path.splitext(filename)[0] + '.json', 'w') as file:
+        json.dump(dict(params, id=level_id, version=VERSION), file, indent=2)
+    return filename
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate random solvable Sokoban levels')
+    parser.add_argument('--width', type=int, default=10, help='columns, outer walls included (default: 10)')
+    parser.add_argument('--height', type=int, default=8, help='rows, outer walls included (default: 8)')
+    parser.add_argument('--stones', type=int, default=3, help='number of stones (default: 3)')
+    parser.add_argument('--weights', type=parse_weights, default=(1, 9), metavar='LOW-HIGH',
+                        help='range of the stone weights (default: 1-9)')
+    parser.add_argument('--walls', type=float, default=0.15,
+                        help='fraction of the inner cells turned into walls (default: 0.15)')
+    parser.add_argument('--pulls', type=int, help='pulls away from the solved position (default: stones * (width + height))')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first level; the next ones count up (default: 0)')
+    parser.add_argument('--count', type=int, default=1, help='number of levels (default: 1)')
+    parser.add_argument('--params', metavar='FILE', help='rebuild the level described by a sidecar file')
+    parser.add_argument('--directory', default='generated', help='where the levels go (default: generated)')
+    parser.add_argument('--first-id', type=int,
+                        help='number of the first level file (default: 101, or the id of the --params file)')
+    args = parser.parse_args()
+
+    if args.params:
+        with open(args.params) as file:
+            params = json.load(file)
+        if params.pop('version', VERSION) != VERSION:
+            print(f'Warning: {args.params} was made by another generator version; the level may differ')
+        # Sidecars without an id are named after their level
+        match = re.search(r'input-(\d+)\.json$', args.params)
+        level_id = params.pop('id', int(match.group(1)) if match else FIRST_ID)
+        first_id = level_id if args.first_id is None else args.first_id
+        runs = [params]
+    else:
+        runs = [{
+            'width': args.width,
+            'height': args.height,
+            'stones': args.stones,
+            'weights': list(args.weights),
+            'seed': args.seed + number,
+            'walls': args.walls,
+            'pulls': args.pulls,
+        } for number in range(args.count)]
+        first_id = FIRST_ID if args.first_id is None else args.first_id
+
+    for number, params in enumerate(runs):
+        try:
+            filename = write_level(args.directory, first_id + number, params)
+        except ValueError as e:
+            raise SystemExit(f'Error: {e}')
+        print(filename)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,9 +3,53 @@ import pygame_widgets
 
 from src.events import *
 from src.game import Game
+from src.level import parse_level
+from src.replay import Board
 from src.run_path import play_solution
 from src.widgets import sidebar_widgets
 
+# Solve events -> (output directory, name shown)
+SOLVERS = {
+    SOLVE_UCS_EVENT: ('UCS', 'UCS'),
+    SOLVE_ASTARMAN_EVENT: ('A', 'A*'),
+    SOLVE_DFS_EVENT: ('DFS', 'DFS'),
+    SOLVE_BFS_EVENT: ('BFS', 'BFS'),
+}
+
+
+def load_solution(algorithm, name, level, game, widgets, moves, sum_weight):
+    """Play output/<algorithm>/output-XX.txt, checked first with the replay engine.
+
+    A broken solution is played up to the move that fails, and the reason
+    is shown under it.
+    """
+    try:
+        with open(f'output/{algorithm}/output-{level:02d}.txt', 'r') as f:
+            lines = f.readlines()
+        # A record without a solution has its statistics on the third line
+        if lines[0].startswith('No solution'):
+            widgets['paths'].set_text(f'[{name}] Solution Not Found!\n{lines[0].strip()}', 20)
+            return moves, sum_weight
+        alg = lines[0].strip()
+        ans = lines[1].strip()
+        move_sequence = lines[2].strip()
+        board = Board(*parse_level(game.path))
+        valid, steps, _, failing = board.replay(move_sequence)
+        if valid:
+            widgets['paths'].set_text(f'{alg}\n{ans}\n{move_sequence}', 10, 'red')
+        else:
+            widgets['paths'].set_text(
+                f'{alg}\n{ans}\n{move_sequence}\nInvalid: {board.describe(move_sequence, failing)}',
+                10, 'red'
+            )
+        return play_solution(move_sequence[:steps], game, widgets, True, moves, sum_weight)
+    except Exception as e:
+        widgets['paths'].set_text(
+            f'[{name}] Solution Not Found!\nError: ' + str(e),
+            20,
+        )
+        return moves, sum_weight
+
 
 def play_game(window, level=1, **widgets):
     moves = 0
@@ -49,90 +93,13 @@ def play_game(window, level=1, **widgets):
                     'keep_playing': True,
                     'reset': level + 1,
                 }
-            elif event.type == SOLVE_UCS_EVENT:
-                print('Loading solution from output file for UCS\n')
-                show_solution = True
-                try:
-                    with open(f'output/UCS/output-{level:02d}.txt', 'r') as f:
-                        lines = f.readlines()
-                        alg = lines[0].strip()
-                        ans = lines[1].strip()
-                        move_sequence = lines[2].strip()
-                    widgets['paths'].set_text(
-                        f'{alg}\n{ans}\n{move_sequence}',
-                        10, 'red'
-                    )
-                    moves, sum_weight = play_solution(move_sequence, game, widgets, show_solution, moves, sum_weight)
-                    if game.is_level_complete():
-                        solved_via_algorithm = True
-                except Exception as e:
-                    widgets['paths'].set_text(
-                        '[UCS] Solution Not Found!\nError: ' + str(e),
-                        20,
-                    )
-            elif event.type == SOLVE_ASTARMAN_EVENT:
-                print('Loading solution from output file for A*\n')
-                show_solution = True
-                try:
-                    with open(f'output/A/output-{level:02d}.txt', 'r') as f:
-                        lines = f.readlines()
-                        alg = lines[0].strip()
-                        ans = lines[1].strip()
-                        move_sequence = lines[2].strip()
-                    widgets['paths'].set_text(
-                        f'{alg}\n{ans}\n{move_sequence}',
-                        10, 'red'
-                    )
-                    moves, sum_weight = play_solution(move_sequence, game, widgets, show_solution, moves, sum_weight)
-                    if game.is_level_complete():
-                        solved_via_algorithm = True
-                except Exception as e:
-                    widgets['paths'].set_text(
-                        '[A*] Solution Not Found!\nError: ' + str(e),
-                        20,
-                    )
-            elif event.type == SOLVE_DFS_EVENT:
-                print('Loading solution from output file for DFS\n')
-                show_solution = True
-                try:
-                    with open(f'output/DFS/output-{level:02d}.txt', 'r') as f:
-                        lines = f.readlines()
-                        alg = lines[0].strip()
-                        ans = lines[1].strip()
-                        move_sequence = lines[2].strip()
-                    widgets['paths'].set_text(
-                        f'{alg}\n{ans}\n{move_sequence}',
-                        10, 'red'
-                    )
-                    moves, sum_weight = play_solution(move_sequence, game, widgets, show_solution, moves, sum_weight)
-                    if game.is_level_complete():
-                        solved_via_algorithm = True
-                except Exception as e:
-                    widgets['paths'].set_text(
-                        '[DFS] Solution Not Found!\nError: ' + str(e),
-                        20,
-                    )
-            elif event.type == SOLVE_BFS_EVENT:
-                print('Loading solution from output file for BFS\n')
+            elif event.type in SOLVERS:
+                algorithm, name = SOLVERS[event.type]
+                print(f'Loading solution from output file for {name}\n')
                 show_solution = True
-                try:
-                    with open(f'output/BFS/output-{level:02d}.txt', 'r') as f:
-                        lines = f.readlines()
-                        alg = lines[0].strip()
-                        ans = lines[1].strip()
-                        move_sequence = lines[2].strip()
-                    widgets['paths'].set_text(
-                        f'{alg}\n{ans}\n{move_sequence}',
-                        10, 'red'
-                    )
-                    moves, sum_weight = play_solution(move_sequence, game, widgets, show_solution, moves, sum_weight)
-                    if game.is_level_complete():
-                        solved_via_algorithm = True
-                except Exception as e:
-                    widgets['paths'].set_text(
-                        '[BFS] Solution Not Found!\nError: ' + str(e),
-                        20,
-                    )
+                moves, sum_weight = load_solution(algorithm, name, level, game, widgets, moves, sum_weight)
+                if game.is_level_complete():
+                    solved_via_algorithm = True
         game.floor_group.draw(window)
         game.switch_group.draw(window)
         game.object_group.draw(window)
@@ -0,0 +1,210 @@
+"""Race several solvers on the same level and keep the first and the best result.
+
+    python portfolio.py 4                        # A, UCS, BFS and DFS on level 4
+    python portfolio.py -a A,DFS,IDA 4 9 --deadline 30
+
+Every selected algorithm runs in its own process. The first solution is
+reported as soon as it arrives. After that the solvers that cannot do
+better are cancelled: every other non-optimal one, and everything once an
+optimal solver (OPTIMAL) has finished. Otherwise the optimal solvers keep
+running until --deadline, counted from the start. Each solver writes its
+usual output/<ALG>/output-XX.txt, except a cancelled one: that file is
+left as it was before the race. output/portfolio/output-XX.txt holds the
+best solution under a header that names the first and the best engine,
+followed by one line per engine.
+"""
+
+import argparse
+import os
+import queue as queues
+import time
+from multiprocessing import Event, Process, Queue
+
+from solve import ALGORITHMS, NO_MACROS, find_levels, parse_algorithms, run
+from src.budget import Budget
+from src.cache import modified
+from src.options import add_search_arguments, search_options
+from src.stats import Stats, read_record
+
+# Solvers whose solutions always have the lowest weight
+OPTIMAL = {'A', 'BDS', 'HDA', 'IDA', 'UCS'}
+DEFAULT = ['A', 'BFS', 'DFS', 'UCS']
+# Seconds a cancelled solver gets to write its record before it is killed
+GRACE = 5.0
+# Seconds between checks for solver processes that died
+POLL = 0.5
+
+
+def compete(algorithm, filename, level_id, options, budget, memory, macros, results):
+    """Body of one solver process: solve, then report (algorithm, ms, weight).
+
+    A result is reported even when the solver fails, with weight None. The
+    record is only read if the solver wrote it, not left from an earlier run.
+    A cancelled solver's record is not an outcome of the solver, so the
+    record that was there before it ran is put back.
+    """
+    output_filename = os.path.join('output', algorithm, f'output-{level_id:02d}.txt')
+    before = modified(output_filename)
+    previous = None
+    if before is not None:
+        with open(output_filename) as file:
+            previous = file.read()
+    start = time.time()
+    weight = None
+    try:
+        run(algorithm, filename, level_id, options, budget, Stats(memory), macros)
+        if budget.reason == 'cancelled':
+            restore(output_filename, previous)
+        elif modified(output_filename) != before:
+            _, weight = read_record(output_filename)
+    except Exception as error:
+        print(f'{algorithm} {filename}: {type(error).__name__}: {error}')
+    results.put((algorithm, (time.time() - start) * 1000, weight))
+
+
+def restore(output_filename, record):
+    """Put record back into output_filename, or remove the file if record is None."""
+    if record is None:
+        if os.path.exists(output_filename):
+            os.remove(output_filename)
+        return
+    with open(output_filename + '.tmp', 'w') as file:
+        file.write(record)
+    os.replace(output_filename + '.tmp', output_filename)
+
+
+def collect(results, processes, outcomes, end):
+    """Yield (algorithm, ms, weight) from results until every solver reported or end passes.
+
+    A solver process that died without reporting counts as (algorithm, 0, None).
+    """
+    while len(outcomes) < len(processes):
+        remaining = None if end is None else end - time.time()
+        if remaining is not None and remaining <= 0:
+            return
+        # Whatever a process put before it exited is already in the queue
+        exited = [algorithm for algorithm, process in processes.items()
+                  if algorithm not in outcomes and process.exitcode is not None]
+        try:
+            yield results.get(timeout=POLL if remaining is None else min(POLL, remaining))
+        except queues.Empty:
+            for algorithm in exited:
+                if algorithm not in outcomes:
+                    yield algorithm, 0.0, None
+
+
+def portfolio(filename, level_id, algorithms=DEFAULT, options=(), deadline=None, memory=True, macros=()):
+    """Race algorithms on one level; yields (algorithm, ms, weight, cancelled) as they finish.
+
+    weight is None if the algorithm found nothing, and cancelled tells
+    whether it was stopped before it could.
+
+    The first solution comes out as soon as it is found. When the
+    generator is exhausted or closed, every solver has stopped and the
+    combined record has been written.
+    """
+    start = time.time()
+    results = Queue()
+    cancels = {algorithm: Event() for algorithm in algorithms}
+    # Solvers are not daemons: HDA starts worker processes of its own
+    processes = {
+        algorithm: Process(target=compete, args=(algorithm, filename, level_id, options,
+                                                 Budget(cancel=cancels[algorithm]), memory, macros, results))
+        for algorithm in algorithms
+    }
+    outcomes = {}  # algorithm -> (ms, weight)
+    first = best = None
+    cancelled = set()
+    try:
+        for process in processes.values():
+            process.start()
+        for algorithm, elapsed, weight in collect(results, processes, outcomes,
+                                                  None if deadline is None else start + deadline):
+            outcomes[algorithm] = elapsed, weight
+            yield algorithm, elapsed, weight, algorithm in cancelled and weight is None
+            if weight is None:
+                continue
+            first = first or algorithm
+            if best is None or weight < outcomes[best][1]:
+                best = algorithm
+            if algorithm in OPTIMAL:
+                break
+            # Only an optimal solver can still improve on this
+            for other in algorithms:
+                if other not in OPTIMAL and other not in outcomes:
+                    cancels[other].set()
+                    cancelled.add(other)
+            if not OPTIMAL.intersection(algorithms):
+                break
+
+        # Stop the losers and let them write their records
+        for algorithm, cancel in cancels.items():
+            if algorithm not in outcomes:
+                cancel.set()
+                cancelled.add(algorithm)
+        for algorithm, elapsed, weight in collect(results, processes, outcomes, time.time() + GRACE):
+            outcomes[algorithm] = elapsed, weight
+            yield algorithm, elapsed, weight, algorithm in cancelled and weight is None
+    finally:
+        for cancel in cancels.values():
+            cancel.set()
+        end = time.time() + GRACE
+        for process in processes.values():
+            process.join(max(0.0, end - time.time()))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        write_portfolio(level_id, algorithms, outcomes, cancelled, first, best)
+
+
+def describe(weight, cancelled):
+    if weight is not None:
+        return f'weight {weight}'
+    return 'cancelled' if cancelled else 'no solution'
+
+
+def write_portfolio(level_id, algorithms, outcomes, cancelled, first, best):
+    """Write output/portfolio/output-XX.txt from the records of the engines."""
+    output_dir = os.path.join('output', 'portfolio')
+    os.makedirs(output_dir, exist_ok=True)
+    if best is not None:
+        with open(os.path.join('output', best, f'output-{level_id:02d}.txt')) as file:
+            lines = file.read().split('\n')
+        lines = [f'Portfolio (first: {first}, best: {best})', lines[1], lines[2]]
+    else:
+        lines = ['No solution found.']
+    for algorithm in algorithms:
+        if algorithm not in outcomes:
+            lines.append(f'{algorithm}: killed')
+            continue
+        elapsed, weight = outcomes[algorithm]
+        lines.append(f'{algorithm}: {describe(weight, algorithm in cancelled)} in {elapsed:.2f} ms')
+    with open(os.path.join(output_dir, f'output-{level_id:02d}.txt'), 'w') as file:
+        file.write('\n'.join(lines) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Race the Sokoban solvers on each level')
+    parser.add_argument('levels', nargs='*',
+                        help='level ids or glob patterns of input files (default: input/input-*.txt)')
+    parser.add_argument('-a', '--algorithms', type=parse_algorithms, default=DEFAULT,
+                        help=f"comma-separated algorithms out of {', '.join(sorted(ALGORITHMS))} "
+                             f"(default: {','.join(DEFAULT)})")
+    parser.add_argument('--deadline', type=float, metavar='SECONDS',
+                        help='cancel the optimal solvers too once this much time has passed')
+    parser.add_argument('--no-memory', action='store_true', help='do not sample the memory use of the searches')
+    add_search_arguments(parser)
+    args = parser.parse_args()
+    unsupported = sorted(NO_MACROS.intersection(args.algorithms))
+    if args.macros and unsupported:
+        parser.error(f"{', '.join(unsupported)} do not support --macros; pick the algorithms with -a")
+
+    options = search_options(args)
+    for level_id, filename in find_levels(args.levels):
+        for algorithm, elapsed, weight, cancelled in portfolio(filename, level_id, args.algorithms, options,
+                                                               args.deadline, not args.no_memory, args.macros):
+            print(f'{algorithm} {filename}: {describe(weight, cancelled)} after {elapsed:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
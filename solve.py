@@ -0,0 +1,153 @@
+"""Run any of the solvers on any of the levels, optionally in parallel.
+
+    python solve.py                      # every algorithm on input/input-*.txt
+    python solve.py -a A,UCS 4 9         # A* and UCS on levels 4 and 9
+    python solve.py -a BFS 'input/input-0*.txt' --jobs 4
+
+Results go to the same output/<ALG>/output-XX.txt files as the per-algorithm
+scripts. (algorithm, level) pairs are handed out longest first, using the
+time recorded in the previous output file, so the slow ones do not end up
+running alone at the end. --time-limit, --node-limit and --memory-limit
+bound every single search; a search that breaks one writes a
+'No solution found (... budget exceeded).' record instead of a path.
+--no-memory skips sampling the resident set size (Memory (MB): n/a).
+--cache reuses the records stored in a solution cache (src/cache.py) and
+stores new ones, so a batch that is run again only solves the new levels.
+--macros turns on macro moves in every solver except BDS, whose backward
+search has no macros, and HDA, whose workers would number them differently.
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import A
+from src.budget import Budget
+from src.cache import SolutionCache
+from src.options import add_search_arguments, search_options
+from src.stats import Stats
+import BDS
+import BFS
+import DFS
+import HDA
+import IDA
+import UCS
+
+# Output directory name -> function solving one level into that directory
+ALGORITHMS = {
+    'A': A.search,
+    'BDS': BDS.search,
+    'BFS': BFS.search,
+    'DFS': DFS.search,
+    'HDA': HDA.search,
+    'IDA': IDA.search,
+    'UCS': UCS.Search,
+}
+
+# Solvers that take no macros option
+NO_MACROS = {'BDS', 'HDA'}
+
+LEVEL_ID = re.compile(r'input-(\d+)\.txt$')
+TIME = re.compile(r'Time \(ms\): ([\d.]+)')
+
+
+def parse_algorithms(text):
+    algorithms = [name.strip().upper() for name in text.split(',') if name.strip()]
+    for name in algorithms:
+        if name not in ALGORITHMS:
+            raise argparse.ArgumentTypeError(f'unknown algorithm {name}')
+    return algorithms
+
+
+def find_levels(patterns):
+    """Map level ids or glob patterns to (id, input file) pairs."""
+    levels = {}
+    for pattern in patterns or ['input/input-*.txt']:
+        if pattern.isdigit():
+            files = [os.path.join('input', f'input-{int(pattern):02d}.txt')]
+            files = [filename for filename in files if os.path.isfile(filename)]
+        else:
+            files = sorted(glob.glob(pattern))
+        if not files:
+            raise SystemExit(f'Error: no level matches {pattern}')
+        for filename in files:
+            match = LEVEL_ID.search(filename)
+            if match is None:
+                raise SystemExit(f'Error: {filename} is not named input-XX.txt')
+            levels[filename] = int(match.group(1))
+    return sorted((level_id, filename) for filename, level_id in levels.items())
+
+
+def expected_time(algorithm, level_id):
+    """Time (ms) of the previous run, or infinity if it is unknown."""
+    output_file = os.path.join('output', algorithm, f'output-{level_id:02d}.txt')
+    try:
+        with open(output_file) as file:
+            match = TIME.search(file.read())
+    except OSError:
+        match = None
+    return float(match.group(1)) if match else float('inf')
+
+
+def run(algorithm, filename, level_id, options, budget, stats, macros=(), cache=None):
+    start = time.time()
+    extra = {'macros': macros} if macros else {}
+    if cache is not None:
+        cache.run(algorithm, ALGORITHMS[algorithm], filename, level_id, *options, budget=budget, stats=stats, **extra)
+    else:
+        ALGORITHMS[algorithm](filename, level_id, *options, budget=budget, stats=stats, **extra)
+    return (time.time() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the Sokoban solvers on a set of levels')
+    parser.add_argument('levels', nargs='*',
+                        help='level ids or glob patterns of input files (default: input/input-*.txt)')
+    parser.add_argument('-a', '--algorithms', type=parse_algorithms, default=sorted(ALGORITHMS),
+                        help=f"comma-separated algorithms out of {', '.join(sorted(ALGORITHMS))} (default: all)")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='number of worker processes')
+    parser.add_argument('--time-limit', type=float, metavar='SECONDS', help='wall-clock budget per search')
+    parser.add_argument('--node-limit', type=int, metavar='N', help='node budget per search')
+    parser.add_argument('--memory-limit', type=float, metavar='MB', help='resident memory budget per search')
+    parser.add_argument('--no-memory', action='store_true', help='do not sample the memory use of the searches')
+    add_search_arguments(parser, cache=True)
+    args = parser.parse_args()
+    unsupported = sorted(NO_MACROS.intersection(args.algorithms))
+    if args.macros and unsupported:
+        parser.error(f"{', '.join(unsupported)} do not support --macros; pick the algorithms with -a")
+
+    options = search_options(args)
+    budget = Budget(
+        time_ms=args.time_limit * 1000 if args.time_limit is not None else None,
+        nodes=args.node_limit,
+        memory_mb=args.memory_limit,
+    )
+    stats = Stats(memory=not args.no_memory)
+    cache = SolutionCache(args.cache) if args.cache else None
+    tasks = [(algorithm, filename, level_id)
+             for level_id, filename in find_levels(args.levels)
+             for algorithm in args.algorithms]
+    # Longest expected first; levels never run before go at the very front
+    tasks.sort(key=lambda task: expected_time(task[0], task[2]), reverse=True)
+
+    start = time.time()
+    if args.jobs <= 1:
+        for algorithm, filename, level_id in tasks:
+            elapsed = run(algorithm, filename, level_id, options, budget, stats, args.macros, cache)
+            print(f'{algorithm} {filename}: {elapsed:.2f} ms')
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            futures = {executor.submit(run, algorithm, filename, level_id, options, budget, stats, args.macros, cache):
+                           (algorithm, filename)
+                       for algorithm, filename, level_id in tasks}
+            for future in as_completed(futures):
+                algorithm, filename = futures[future]
+                print(f'{algorithm} {filename}: {future.result():.2f} ms')
+    print(f'Total: {(time.time() - start) * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Time, node and memory limits for a search.
+
+The search loops call exceeded() once per expansion; the clock and the
+process memory are only read every CHECK_EVERY calls, so an unlimited or
+generous budget costs next to nothing. Memory is the resident set size
+reported by the OS, which is much cheaper to sample than tracemalloc.
+A search can also be cancelled from another process through an event,
+which is looked at on the same schedule.
+"""
+
+import time
+
+import psutil
+
+CHECK_EVERY = 1024
+
+
+class Budget:
+    def __init__(self, time_ms=None, nodes=None, memory_mb=None, check_every=CHECK_EVERY, cancel=None):
+        self.time_ms = time_ms
+        self.nodes = nodes
+        self.memory_mb = memory_mb
+        self.check_every = check_every
+        self.cancel = cancel  # multiprocessing.Event that stops the search once set
+        self.reason = None  # 'time', 'nodes', 'memory' or 'cancelled' once a limit is broken
+        self.start_time = None
+        self.next_check = 0
+        self.process = None
+
+    def start(self):
+        """Start counting; called by the search before its first expansion."""
+        self.reason = None
+        self.start_time = time.time()
+        self.next_check = self.check_every
+        if self.memory_mb is not None and self.process is None:
+            self.process = psutil.Process()
+        return self
+
+    def exceeded(self, nodes):
+        """Check the limits after nodes expansions; sets and returns reason."""
+        if self.nodes is not None and nodes >= self.nodes:
+            self.reason = 'nodes'
+        elif nodes < self.next_check:
+            return None
+        else:
+            self.next_check = nodes + self.check_every
+            self.check()
+        return self.reason
+
+    def check(self, memory_mb=None):
+        """Check the time, memory and cancel limits now; sets and returns reason.
+
+        memory_mb replaces the resident size of this process, for a search
+        whose memory is held by other processes.
+        """
+        if self.time_ms is not None and (time.time() - self.start_time) * 1000 > self.time_ms:
+            self.reason = 'time'
+        elif self.memory_mb is not None and (
+                memory_mb if memory_mb is not None else self.process.memory_info().rss / (1024 * 1024)
+        ) > self.memory_mb:
+            self.reason = 'memory'
+        elif self.cancel is not None and self.cancel.is_set():
+            self.reason = 'cancelled'
+        return self.reason
+
+    def __getstate__(self):
+        # psutil handles stay in the process that created them
+        state = self.__dict__.copy()
+        state['process'] = None
+        return state
+
+
+def no_solution(budget):
+    """First line of the output record of a search that found nothing."""
+    if budget is not None and budget.reason == 'cancelled':
+        return 'No solution found (cancelled).'
+    if budget is not None and budget.reason:
+        return f'No solution found ({budget.reason} budget exceeded).'
+    return 'No solution found.'
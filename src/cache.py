@@ -0,0 +1,133 @@
+"""Persistent cache of solver results, keyed by what the level is rather than its name.
+
+The key is a hash of the normalized level (weights and map rows without
+trailing blanks), the algorithm and every option of its search function
+after defaults are filled in, so a renamed or copied level is still a hit
+and any change of options is a miss. The value is the whole output record.
+Entries live in one SQLite file. The least recently used ones are dropped
+beyond max_entries, and entries written by another SOLVER_VERSION are
+dropped when the cache is opened.
+
+Only records that do not depend on the budget are stored: those of a
+search that ran to the end, so not of one whose budget has a reason set.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import time
+
+from .level import parse_level
+
+# Bump when a change to the solvers makes earlier records wrong
+SOLVER_VERSION = 1
+DEFAULT_PATH = os.path.join('cache', 'solutions.sqlite')
+MAX_ENTRIES = 100_000
+# Arguments that only bound or measure a search
+IGNORED = {'filename', 'input_file', 'file_path', 'id', 'i', 'id_file', 'budget', 'stats'}
+
+
+class SolutionCache:
+    def __init__(self, path=DEFAULT_PATH, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.connection = None
+        self.hits = 0
+        self.misses = 0
+
+    def connect(self):
+        """Open the database on first use; each process gets its own connection."""
+        if self.connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=60)
+            with self.connection:
+                self.connection.execute(
+                    'CREATE TABLE IF NOT EXISTS solutions '
+                    '(key TEXT PRIMARY KEY, version INTEGER, record TEXT, used REAL)')
+                self.connection.execute('CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)')
+                self.connection.execute('DELETE FROM solutions WHERE version != ?', (SOLVER_VERSION,))
+        return self.connection
+
+    def key(self, algorithm, search, filename, id, *args, **kwargs):
+        """Hash of the normalized level, the algorithm and the search options."""
+        weights, grid = parse_level(filename)
+        rows = [row.rstrip() for row in grid]
+        while rows and not rows[-1]:
+            rows.pop()
+        arguments = inspect.signature(search).bind(filename, id, *args, **kwargs)
+        arguments.apply_defaults()
+        options = {name: value for name, value in arguments.arguments.items() if name not in IGNORED}
+        text = json.dumps([weights, rows, algorithm, options], sort_keys=True, default=list)
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def get(self, key):
+        connection = self.connect()
+        with connection:
+            row = connection.execute('SELECT record FROM solutions WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                connection.execute('UPDATE solutions SET used = ? WHERE key = ?', (time.time(), key))
+        return row[0] if row is not None else None
+
+    def put(self, key, record):
+        connection = self.connect()
+        with connection:
+            connection.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)',
+                               (key, SOLVER_VERSION, record, time.time()))
+            count = connection.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+            if count > self.max_entries:
+                connection.execute('DELETE FROM solutions WHERE key IN '
+                                   '(SELECT key FROM solutions ORDER BY used LIMIT ?)',
+                                   (count - self.max_entries,))
+
+    def run(self, algorithm, search, filename, id, *args, **kwargs):
+        """Write output/<algorithm>/output-XX.txt from the cache, or by calling search.
+
+        search is the solver's search function and the rest are its
+        arguments. Returns True on a cache hit.
+        """
+        try:
+            key = self.key(algorithm, search, filename, id, *args, **kwargs)
+        except (OSError, ValueError):
+            search(filename, id, *args, **kwargs)  # Let the solver report the broken level
+            return False
+        output_dir = os.path.join('output', algorithm)
+        output_filename = os.path.join(output_dir, f'output-{id:02d}.txt')
+        record = self.get(key)
+        if record is not None:
+            self.hits += 1
+            os.makedirs(output_dir, exist_ok=True)
+            with open(output_filename + '.tmp', 'w') as file:
+                file.write(record)
+            os.replace(output_filename + '.tmp', output_filename)
+            return True
+
+        self.misses += 1
+        before = modified(output_filename)
+        search(filename, id, *args, **kwargs)
+        if modified(output_filename) == before:
+            return False  # The solver wrote nothing, so the file is an old one
+        budget = inspect.signature(search).bind(filename, id, *args, **kwargs).arguments.get('budget')
+        if budget is not None and budget.reason:
+            return False  # Stopped early, whatever it found may not be final
+        with open(output_filename) as file:
+            record = file.read()
+        self.put(key, record)
+        return False
+
+    def __getstate__(self):
+        # sqlite connections stay in the process that opened them
+        state = self.__dict__.copy()
+        state['connection'] = None
+        return state
+
+
+def modified(filename):
+    """Modification time of filename in nanoseconds, or None if it does not exist."""
+    try:
+        return os.stat(filename).st_mtime_ns
+    except OSError:
+        return None
@@ -0,0 +1,99 @@
+"""Dynamic deadlock detection, run after every push.
+
+A stone that can no longer move along either axis is frozen, and a frozen
+stone that is not on a switch can never be brought to one. Only the stones
+around the pushed one are looked at, so each result depends on a small
+neighbourhood and is cached by it.
+"""
+
+# Half the side of the square neighbourhood looked at around a pushed stone
+RADIUS = 2
+CACHE_SIZE = 1 << 16
+
+
+class DeadlockDetector:
+    def __init__(self, level):
+        self.level = level
+        self.pruned = 0
+        self.cache = {}
+        self.windows = {}
+
+    def window(self, cell):
+        """Cells of the neighbourhood around cell."""
+        window = self.windows.get(cell)
+        if window is None:
+            width = self.level.width
+            window = frozenset(cell + di * width + dj
+                               for di in range(-RADIUS, RADIUS + 1)
+                               for dj in range(-RADIUS, RADIUS + 1))
+            self.windows[cell] = window
+        return window
+
+    def is_deadlock(self, cell, stones):
+        """Check if the stone just pushed onto cell is part of a deadlock."""
+        window = self.window(cell)
+        nearby = tuple(sorted(stone for stone in stones if stone in window))
+        key = (cell, nearby)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.is_square(cell, nearby) or self.is_frozen(cell, nearby)
+            if len(self.cache) >= CACHE_SIZE:
+                self.cache.clear()
+            self.cache[key] = result
+        if result:
+            self.pruned += 1
+        return result
+
+    def is_square(self, cell, stones):
+        """2x2 block of walls and stones with a stone off the switches."""
+        level = self.level
+        walls = level.walls
+        is_switch = level.is_switch
+        width = level.width
+        for corner in (cell, cell - 1, cell - width, cell - width - 1):
+            block = (corner, corner + 1, corner + width, corner + width + 1)
+            if not all(walls[c] or c in stones for c in block):
+                continue
+            if any(c in stones and not is_switch[c] for c in block):
+                return True
+        return False
+
+    def is_frozen(self, cell, stones):
+        """Freeze deadlock: the stone on cell and the stones holding it in place
+        can never move again and one of them is not on a switch."""
+        frozen = []
+        if not self.blocked(cell, stones, set(), frozen):
+            return False
+        is_switch = self.level.is_switch
+        return any(not is_switch[stone] for stone in frozen)
+
+    def blocked(self, cell, stones, holding, frozen):
+        """Check if the stone on cell can move along neither axis.
+
+        Stones in holding are being checked further up and count as walls,
+        which breaks cycles. Every stone found frozen is added to frozen.
+        """
+        level = self.level
+        walls = level.walls
+        dead = level.dead
+        holding.add(cell)
+        result = True
+        for offset in (level.width, 1):  # vertical, horizontal
+            before, after = cell - offset, cell + offset
+            if walls[before] or walls[after] or before in holding or after in holding:
+                continue
+            if dead[before] and dead[after]:
+                continue
+            mark = len(frozen)
+            if before in stones and self.blocked(before, stones, holding, frozen):
+                continue
+            del frozen[mark:]
+            if after in stones and self.blocked(after, stones, holding, frozen):
+                continue
+            del frozen[mark:]
+            result = False
+            break
+        holding.discard(cell)
+        if result:
+            frozen.append(cell)
+        return result
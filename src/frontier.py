@@ -0,0 +1,160 @@
+"""Open lists for the best-first searches (A* and UCS).
+
+Entries are plain tuples ending in the key, which is the Zobrist key of
+the state; the caller keeps the state itself. Improving a
+state just pushes it again: the older entry is left in place and skipped
+when it comes out (lazy deletion), which is cheaper than a decrease-key.
+"""
+
+from collections import deque
+from heapq import heappop, heappush
+from itertools import count
+
+
+# Order among entries of equal priority: (sign of g, sign of the counter).
+# A larger g means a smaller h at equal f, so 'high-g' dives towards the goal
+# instead of widening a plateau of zero-cost walks.
+TIE_BREAKS = {
+    'fifo': (0, 1),  # insertion order
+    'lifo': (0, -1),  # newest first
+    'low-g': (1, 1),  # smaller g, then insertion order
+    'high-g': (-1, -1),  # larger g, then newest first
+}
+
+
+class HeapFrontier:
+    """Binary heap ordered by priority, then by a TIE_BREAKS policy."""
+
+    def __init__(self, tie_break='high-g'):
+        self.heap = []
+        self.counter = count()
+        self.g_sign, self.order_sign = TIE_BREAKS[tie_break]
+        self.live = {}  # key -> g of the entry that is still valid
+
+    def __len__(self):
+        return len(self.live)
+
+    def __bool__(self):
+        return bool(self.live)
+
+    def push(self, key, priority, g):
+        self.live[key] = g
+        heappush(self.heap, (priority, self.g_sign * g, self.order_sign * next(self.counter), g, key))
+
+    def pop(self):
+        """Remove and return the (key, g) of the best valid entry."""
+        heap = self.heap
+        live = self.live
+        while heap:
+            _, _, _, g, key = heappop(heap)
+            if live.get(key) == g:
+                del live[key]
+                return key, g
+        raise IndexError('pop from an empty frontier')
+
+
+class BucketFrontier:
+    """Bucket queue for small non-negative integer priorities.
+
+    Push and pop are O(1) apart from walking over empty buckets. Within a
+    bucket the most recently pushed entry comes out first.
+    """
+
+    def __init__(self):
+        self.buckets = []
+        self.current = 0  # no valid entry has a smaller priority
+        self.live = {}
+
+    def __len__(self):
+        return len(self.live)
+
+    def __bool__(self):
+        return bool(self.live)
+
+    def push(self, key, priority, g):
+        buckets = self.buckets
+        while len(buckets) <= priority:
+            buckets.append([])
+        buckets[priority].append((g, key))
+        if priority < self.current:
+            self.current = priority
+        self.live[key] = g
+
+    def pop(self):
+        """Remove and return the (key, g) of the best valid entry."""
+        buckets = self.buckets
+        live = self.live
+        while self.current < len(buckets):
+            bucket = buckets[self.current]
+            while bucket:
+                g, key = bucket.pop()
+                if live.get(key) == g:
+                    del live[key]
+                    return key, g
+            self.current += 1
+        raise IndexError('pop from an empty frontier')
+
+
+class DialFrontier:
+    """Dial's bucket queue for uniform-cost search with integer edge costs.
+
+    Priorities are never below the last one popped and at most max_cost
+    above it, so max_cost + 1 buckets reused circularly hold every entry,
+    and push and pop are O(1). A bucket is a deque: zero-cost successors go
+    to its front and come out next, as in 0-1 BFS, while costlier ones are
+    appended to a later bucket. A push further ahead than max_cost (a macro
+    move of several pushes) grows the ring first.
+    """
+
+    def __init__(self, max_cost):
+        self.buckets = [deque() for _ in range(max_cost + 1)]
+        self.current = 0  # priority of the bucket being emptied
+        self.live = {}
+
+    def __len__(self):
+        return len(self.live)
+
+    def __bool__(self):
+        return bool(self.live)
+
+    def push(self, key, priority, g):
+        if priority - self.current >= len(self.buckets):
+            self.grow(priority - self.current + 1)
+        bucket = self.buckets[priority % len(self.buckets)]
+        if priority == self.current:
+            bucket.appendleft((g, key))
+        else:
+            bucket.append((g, key))
+        self.live[key] = g
+
+    def grow(self, size):
+        """Spread the entries over a ring of at least size buckets."""
+        old = self.buckets
+        size = max(size, 2 * len(old))
+        self.buckets = [deque() for _ in range(size)]
+        # Bucket current + shift of the old ring holds priority current + shift
+        for shift in range(len(old)):
+            priority = self.current + shift
+            for g, key in old[priority % len(old)]:
+                if self.live.get(key) == g:
+                    self.buckets[priority % size].append((g, key))
+
+    def pop(self):
+        """Remove and return the (key, g) of the best valid entry."""
+        buckets = self.buckets
+        live = self.live
+        while live:
+            bucket = buckets[self.current % len(buckets)]
+            while bucket:
+                g, key = bucket.popleft()
+                if live.get(key) == g:
+                    del live[key]
+                    return key, g
+            self.current += 1
+        raise IndexError('pop from an empty frontier')
+
+
+FRONTIERS = {
+    'heap': HeapFrontier,
+    'bucket': BucketFrontier,
+}
@@ -0,0 +1,153 @@
+"""Random solvable levels for scaling tests.
+
+A level is built backwards from its solution. The stones start on the
+switches, and the player pulls them away for a while. Every pull undone
+as a push is a move of the real level, so the level is solvable by
+construction. The layout is an open room with random wall cells. A wall
+is only placed where it keeps the floor connected.
+
+All randomness comes from one random.Random(seed). The same parameters
+always give the same level, and the parameters are what the sidecar file
+next to a generated level records.
+"""
+
+import random
+
+# Bump when a change makes the same parameters give a different level
+VERSION = 1
+
+OFFSETS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def generate(width, height, stones, weights=(1, 9), seed=0, walls=0.15, pulls=None, attempts=100):
+    """Text of a level in the input-XX.txt format: the weights line, then the grid.
+
+    width and height include the outer walls. walls is the fraction of the
+    inner cells turned into walls. pulls is the number of pulls made from
+    the solved position; the default grows with the room and the number of
+    stones. A layout where the stones cannot all be pulled away from the
+    switches is thrown away and another one is tried.
+    """
+    if width < 5 or height < 5:
+        raise ValueError('Levels must be at least 5x5.')
+    if stones < 1 or stones * 4 > (width - 2) * (height - 2):
+        raise ValueError(f'A {width}x{height} level cannot hold {stones} stones.')
+    low, high = weights
+    if not 1 <= low <= high:
+        raise ValueError('Weights must be a range of positive integers.')
+    if pulls is None:
+        pulls = stones * (width + height)
+
+    rng = random.Random(seed)
+    for _ in range(attempts):
+        floor = _layout(rng, width, height, walls)
+        result = _pull(rng, floor, stones, pulls)
+        if result is None:
+            continue
+        player, switches, placed = result
+        stone_weights = [rng.randint(low, high) for _ in placed]
+        return _render(width, height, floor, player, switches, placed, stone_weights)
+    raise ValueError(f'No level found after {attempts} attempts; try fewer stones or walls.')
+
+
+def _layout(rng, width, height, density):
+    """Set of (row, column) floor cells: the inner room minus random walls."""
+    floor = {(i, j) for i in range(1, height - 1) for j in range(1, width - 1)}
+    target = int(len(floor) * density)
+    candidates = sorted(floor)
+    rng.shuffle(candidates)
+    placed = 0
+    for cell in candidates:
+        if placed == target:
+            break
+        floor.discard(cell)
+        if _connected(floor):
+            placed += 1
+        else:
+            floor.add(cell)
+    return floor
+
+
+def _connected(floor):
+    start = next(iter(floor))
+    seen = {start}
+    stack = [start]
+    while stack:
+        i, j = stack.pop()
+        for di, dj in OFFSETS:
+            neighbour = (i + di, j + dj)
+            if neighbour in floor and neighbour not in seen:
+                seen.add(neighbour)
+                stack.append(neighbour)
+    return len(seen) == len(floor)
+
+
+def _region(floor, player, stones):
+    """Cells the player can walk to without moving a stone."""
+    region = {player}
+    stack = [player]
+    while stack:
+        i, j = stack.pop()
+        for di, dj in OFFSETS:
+            neighbour = (i + di, j + dj)
+            if neighbour in floor and neighbour not in stones and neighbour not in region:
+                region.add(neighbour)
+                stack.append(neighbour)
+    return region
+
+
+def _pull(rng, floor, count, pulls):
+    """Put count stones on random switches and pull them around.
+
+    Returns (player, switches, stones), or None if every stone is still on
+    a switch or the player has nowhere to stand but a switch.
+    """
+    cells = sorted(floor)
+    # A switch needs a neighbour to pull its stone to and room behind that for the player
+    usable = [(i, j) for i, j in cells
+              if any((i + di, j + dj) in floor and (i + 2 * di, j + 2 * dj) in floor for di, dj in OFFSETS)]
+    if len(usable) < count:
+        return None
+    switches = rng.sample(usable, count)
+    stones = list(switches)
+    free = [cell for cell in cells if cell not in stones]
+    player = rng.choice(free)
+
+    for _ in range(pulls):
+        occupied = set(stones)
+        region = _region(floor, player, occupied)
+        moves = []
+        for index, (i, j) in enumerate(stones):
+            for di, dj in OFFSETS:
+                # The player stands next to the stone and steps back, dragging it along
+                stand = (i + di, j + dj)
+                back = (i + 2 * di, j + 2 * dj)
+                if stand in region and back in floor and back not in occupied:
+                    moves.append((index, stand, back))
+        if not moves:
+            break
+        index, stand, back = rng.choice(moves)
+        stones[index] = stand
+        player = back
+
+    switch_set = set(switches)
+    if all(stone in switch_set for stone in stones):
+        return None
+    # Let the player wander off to a random cell of its region
+    region = sorted(_region(floor, player, set(stones)) - switch_set)
+    if not region:
+        return None
+    return rng.choice(region), switches, stones
+
+
+def _render(width, height, floor, player, switches, stones, weights):
+    rows = [['#' if (i, j) not in floor else ' ' for j in range(width)] for i in range(height)]
+    for i, j in switches:
+        rows[i][j] = '.'
+    for i, j in stones:
+        rows[i][j] = '*' if rows[i][j] == '.' else '$'
+    i, j = player
+    rows[i][j] = '@'
+    lines = [' '.join(map(str, weights))]
+    lines += [''.join(row) for row in rows]
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,118 @@
+"""Admissible heuristics for A*: lower bounds on the weight still to push.
+
+Both take the stone cells of a state (in weight order) and return the bound.
+"""
+
+from .level import UNREACHABLE
+
+# Bound returned for stones that can no longer all reach a switch
+INF = float('inf')
+CACHE_SIZE = 1 << 18
+
+
+class ManhattanHeuristic:
+    """Each stone's weight times its Manhattan distance to the nearest switch."""
+
+    def __init__(self, level):
+        self.weights = level.weights
+        switches = [level.coords(switch) for switch in level.switches]
+        self.distances = []
+        for cell in range(level.size):
+            x, y = level.coords(cell)
+            self.distances.append(min((abs(x - sx) + abs(y - sy) for sx, sy in switches), default=0))
+
+    def __call__(self, stones):
+        distances = self.distances
+        total = 0
+        for stone, weight in zip(stones, self.weights):
+            total += distances[stone] * weight
+        return total
+
+
+class MatchingHeuristic:
+    """Minimum-cost assignment of stones to distinct switches.
+
+    The cost of sending a stone to a switch is its weight times the push
+    distance from its cell to that switch on the empty map, so the bound
+    accounts for walls and never lets two stones share a switch.
+    """
+
+    def __init__(self, level):
+        self.weights = level.weights
+        self.square = len(level.stones) == len(level.switches)
+        self.distances = level.distances.tolist()
+        self.cache = {}
+
+    def __call__(self, stones):
+        if not self.square:
+            return 0
+        h = self.cache.get(stones)
+        if h is None:
+            cost = []
+            for stone, weight in zip(stones, self.weights):
+                row = []
+                for distances in self.distances:
+                    distance = distances[stone]
+                    row.append(INF if distance == UNREACHABLE else distance * weight)
+                cost.append(row)
+            h = hungarian(cost)
+            if len(self.cache) >= CACHE_SIZE:
+                self.cache.clear()
+            self.cache[stones] = h
+        return h
+
+
+def hungarian(cost):
+    """Cost of a minimum-cost perfect matching on a square cost matrix.
+
+    O(n^3) Hungarian algorithm with row/column potentials; returns INF when
+    every perfect matching uses an infinite entry.
+    """
+    n = len(cost)
+    u = [0] * (n + 1)
+    v = [0] * (n + 1)
+    match = [0] * (n + 1)  # match[j]: row assigned to column j (1-based, 0 = none)
+    way = [0] * (n + 1)
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        minv = [INF] * (n + 1)
+        used = [False] * (n + 1)
+        while True:
+            used[j0] = True
+            i0 = match[j0]
+            row = cost[i0 - 1]
+            delta = INF
+            j1 = 0
+            for j in range(1, n + 1):
+                if used[j]:
+                    continue
+                reduced = row[j - 1] - u[i0] - v[j]
+                if reduced < minv[j]:
+                    minv[j] = reduced
+                    way[j] = j0
+                if minv[j] < delta:
+                    delta = minv[j]
+                    j1 = j
+            if delta == INF:
+                return INF
+            for j in range(n + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+    return sum(cost[match[j] - 1][j - 1] for j in range(1, n + 1))
+
+
+HEURISTICS = {
+    'manhattan': ManhattanHeuristic,
+    'matching': MatchingHeuristic,
+}
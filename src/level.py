@@ -0,0 +1,485 @@
+"""Static level data shared by the search algorithms.
+
+The map is parsed once into flat arrays indexed by cell number, so a search
+state only needs the player cell and a tuple with the cell of every stone
+(in input order, which is also the order of the weights).
+
+States are identified in the visited/cost tables by a 64-bit Zobrist key:
+the XOR of a random number for the player cell and one for every
+(stone cell, stone weight) pair. Moving the player or pushing a stone
+updates the key with a couple of XORs instead of rehashing the state, and
+stones of equal weight are interchangeable in the key.
+"""
+
+import hashlib
+import os
+import random
+import tempfile
+from collections import deque
+
+import numpy as np
+
+from .deadlock import DeadlockDetector
+from .macros import MACRO, MacroMoves
+
+# Movement directions: up, down, left, right
+MOVES = 'udlr'
+PUSHES = 'UDLR'
+# Move codes of step successors index STEPS: walks are 0-3, pushes 4-7
+STEPS = MOVES + PUSHES
+
+ZOBRIST_SEED = 0x5EED
+
+# Push distance of a cell from which a stone can never reach the switch
+UNREACHABLE = -1
+
+
+class Level:
+    def __init__(self, weights, grid, dead_squares=True, deadlocks=True, macros=()):
+        self.height = len(grid)
+        # One extra wall column on the right and one wall row above and below
+        # the map, so a neighbour of a map cell is always a valid index.
+        self.width = max((len(row) for row in grid), default=0) + 1
+        self.size = (self.height + 2) * self.width
+        self.offsets = (-self.width, self.width, -1, 1)
+
+        self.walls = bytearray([1]) * self.size
+        self.is_switch = bytearray(self.size)
+        self.player = None
+        stones = []
+        switches = []
+
+        for i, row in enumerate(grid):
+            for j, char in enumerate(row):
+                cell = self.cell(i, j)
+                if char == '#':
+                    continue
+                self.walls[cell] = 0
+                if char == '@':
+                    self.player = cell
+                elif char == '$':
+                    stones.append(cell)
+                elif char == '.':
+                    switches.append(cell)
+                elif char == '*':
+                    stones.append(cell)
+                    switches.append(cell)
+
+        if self.player is None:
+            raise ValueError("Player starting position '@' not found.")
+        if len(stones) != len(weights):
+            raise ValueError('Number of stones does not match number of weights.')
+
+        for cell in switches:
+            self.is_switch[cell] = 1
+        self.switches = tuple(switches)
+        self.stones = tuple(stones)
+        self.weights = tuple(weights)
+        self.solvable = len(stones) == len(switches)
+
+        # Zobrist tables: one per player cell, one per (cell, weight)
+        rng = random.Random(ZOBRIST_SEED)
+        self.player_keys = [rng.getrandbits(64) for _ in range(self.size)]
+        weight_keys = {}
+        for weight in sorted(set(weights)):
+            weight_keys[weight] = [rng.getrandbits(64) for _ in range(self.size)]
+        self.stone_keys = tuple(weight_keys[weight] for weight in weights)
+
+        # Pushes onto a dead square are discarded; pruned counts them
+        self.dead = self.dead_squares() if dead_squares else bytearray(self.size)
+        self.pruned = 0
+        # Pushes that freeze stones off the switches are discarded as well
+        self.deadlocks = DeadlockDetector(self) if deadlocks else None
+        # Pushes that continue through a tunnel or into a goal room are merged
+        self.macros = MacroMoves(self, macros) if macros else None
+        self._distances = None
+
+    @property
+    def deadlocked(self):
+        """Number of pushes discarded by the dynamic deadlock detector."""
+        return self.deadlocks.pruned if self.deadlocks is not None else 0
+
+    @property
+    def distances(self):
+        """NumPy matrix [switch x cell] of push distances, built on first use."""
+        if self._distances is None:
+            table = [self.push_distances(switch) for switch in self.switches]
+            self._distances = np.array(table, dtype=np.int32).reshape(len(self.switches), self.size)
+        return self._distances
+
+    def grid_hash(self):
+        """Hash of everything the push distances depend on."""
+        digest = hashlib.sha1()
+        digest.update(self.width.to_bytes(4, 'little'))
+        digest.update(bytes(self.walls))
+        digest.update(bytes(self.is_switch))
+        return digest.hexdigest()
+
+    def cell(self, i, j):
+        return (i + 1) * self.width + j
+
+    def coords(self, cell):
+        i, j = divmod(cell, self.width)
+        return i - 1, j
+
+    def is_goal(self, stones):
+        """Check if all stones are on switches."""
+        is_switch = self.is_switch
+        return self.solvable and all(is_switch[cell] for cell in stones)
+
+    def dead_squares(self):
+        """Mark the floor cells from which a stone can never reach a switch.
+
+        A stone can get from a cell to a switch exactly when it can be pulled
+        back from that switch to the cell, so every cell reached by pulling
+        from some switch is alive and the remaining floor cells are dead.
+        """
+        walls = self.walls
+        alive = bytearray(self.size)
+        stack = list(self.switches)
+        for cell in stack:
+            alive[cell] = 1
+        while stack:
+            cell = stack.pop()
+            for offset in self.offsets:
+                # The player stands two cells away and pulls the stone one cell
+                target = cell + offset
+                if alive[target] or walls[target] or walls[target + offset]:
+                    continue
+                alive[target] = 1
+                stack.append(target)
+        return bytearray(not (walls[cell] or alive[cell]) for cell in range(self.size))
+
+    def push_distances(self, switch):
+        """Fewest pushes that get a stone from every cell onto switch.
+
+        Computed by pulling a stone backwards from the switch, ignoring the
+        other stones and where the player has to walk, so it never
+        overestimates. Cells the stone cannot come from get UNREACHABLE.
+        """
+        walls = self.walls
+        distances = [UNREACHABLE] * self.size
+        distances[switch] = 0
+        queue = deque([switch])
+        while queue:
+            cell = queue.popleft()
+            for offset in self.offsets:
+                target = cell + offset
+                if distances[target] != UNREACHABLE or walls[target] or walls[target + offset]:
+                    continue
+                distances[target] = distances[cell] + 1
+                queue.append(target)
+        return distances
+
+    def hash(self, player, stones):
+        """Compute the Zobrist key of a state from scratch."""
+        key = self.player_keys[player]
+        for cell, keys in zip(stones, self.stone_keys):
+            key ^= keys[cell]
+        return key
+
+    def successors(self, player, stones, key):
+        """List the (move, player, stones, cost, key) tuples reachable in one step.
+
+        The move is a code indexing STEPS, or a macro code. Walking moves
+        reuse the same stones tuple; only a push builds a new one.
+        """
+        walls = self.walls
+        dead = self.dead
+        deadlocks = self.deadlocks
+        macros = self.macros
+        player_keys = self.player_keys
+        key ^= player_keys[player]
+        result = []
+        for direction, offset in enumerate(self.offsets):
+            target = player + offset
+            if walls[target]:
+                continue
+            if target not in stones:
+                result.append((direction, target, stones, 0, key ^ player_keys[target]))
+                continue
+            beyond = target + offset
+            if walls[beyond] or beyond in stones:
+                continue
+            if dead[beyond]:
+                self.pruned += 1
+                continue
+            index = stones.index(target)
+            move, new_player, count = 4 + direction, target, 1
+            macro = macros.push(index, target, direction, stones) if macros is not None else None
+            if macro is not None:
+                move, beyond, new_player, count = macro
+            new_stones = stones[:index] + (beyond,) + stones[index + 1:]
+            if deadlocks is not None and deadlocks.is_deadlock(beyond, new_stones):
+                continue
+            stone_keys = self.stone_keys[index]
+            new_key = key ^ player_keys[new_player] ^ stone_keys[target] ^ stone_keys[beyond]
+            result.append((move, new_player, new_stones, self.weights[index] * count, new_key))
+        return result
+
+    def reachable(self, player, stones):
+        """Flood-fill the cells the player can walk to without pushing a stone.
+
+        Returns a bytearray marking those cells and the top-left-most of them,
+        which is used as the player cell of a normalized state.
+        """
+        blocked = bytearray(self.walls)
+        for cell in stones:
+            blocked[cell] = 1
+        region = bytearray(self.size)
+        region[player] = 1
+        top_left = player
+        stack = [player]
+        offsets = self.offsets
+        while stack:
+            cell = stack.pop()
+            if cell < top_left:
+                top_left = cell
+            for offset in offsets:
+                neighbour = cell + offset
+                if not blocked[neighbour] and not region[neighbour]:
+                    region[neighbour] = 1
+                    stack.append(neighbour)
+        return region, top_left
+
+    def normalize(self, player, stones):
+        """Canonical player cell of the region the player can walk around in."""
+        return self.reachable(player, stones)[1]
+
+    def search_space(self, pushes=False):
+        """(successor function, start player) of a search over steps or pushes.
+
+        A push-level search expands pushes only, so its states hold the
+        player normalized to its region rather than its exact cell.
+        """
+        if pushes:
+            return self.push_successors, self.normalize(self.player, self.stones)
+        return self.successors, self.player
+
+    def push_successors(self, player, stones, key):
+        """List the (push, player, stones, cost, key) tuples reachable with one push.
+
+        The player walks for free to any cell of its region, so every state
+        is normalized to the top-left-most cell the player can reach and only
+        pushes are generated. A push is coded as stone index * 4 + direction,
+        or with a macro code; solution() turns a sequence of them back into a
+        move string.
+        """
+        walls = self.walls
+        dead = self.dead
+        deadlocks = self.deadlocks
+        macros = self.macros
+        player_keys = self.player_keys
+        region = self.reachable(player, stones)[0]
+        key ^= player_keys[player]
+        result = []
+        for index, stone in enumerate(stones):
+            stone_keys = self.stone_keys[index]
+            for direction, offset in enumerate(self.offsets):
+                beyond = stone + offset
+                if not region[stone - offset] or walls[beyond] or beyond in stones:
+                    continue
+                if dead[beyond]:
+                    self.pruned += 1
+                    continue
+                move, pusher, count = index * 4 + direction, stone, 1
+                macro = macros.push(index, stone, direction, stones) if macros is not None else None
+                if macro is not None:
+                    move, beyond, pusher, count = macro
+                new_stones = stones[:index] + (beyond,) + stones[index + 1:]
+                if deadlocks is not None and deadlocks.is_deadlock(beyond, new_stones):
+                    continue
+                new_player = self.normalize(pusher, new_stones)
+                new_key = key ^ player_keys[new_player] ^ stone_keys[stone] ^ stone_keys[beyond]
+                result.append((move, new_player, new_stones, self.weights[index] * count, new_key))
+        return result
+
+    def pull_predecessors(self, player, stones, key):
+        """List the (push, player, stones, cost, key) tuples one push before this state.
+
+        The inverse of push_successors, used to search backwards from the
+        goal: the player stands where the stone goes and steps back, pulling
+        it along. The push is coded as in push_successors, so it is the move
+        that leads from the returned state to this one.
+        """
+        walls = self.walls
+        player_keys = self.player_keys
+        region = self.reachable(player, stones)[0]
+        key ^= player_keys[player]
+        result = []
+        for index, stone in enumerate(stones):
+            stone_keys = self.stone_keys[index]
+            for direction, offset in enumerate(self.offsets):
+                before = stone - offset
+                if not region[before] or walls[before - offset] or before - offset in stones:
+                    continue
+                new_stones = stones[:index] + (before,) + stones[index + 1:]
+                new_player = self.normalize(before - offset, new_stones)
+                new_key = key ^ player_keys[new_player] ^ stone_keys[stone] ^ stone_keys[before]
+                result.append((index * 4 + direction, new_player, new_stones, self.weights[index], new_key))
+        return result
+
+    def goal_states(self):
+        """List the (player, stones) states of a solved level.
+
+        Stones of equal weight are interchangeable, so one assignment of the
+        stones to the switches is kept per weight pattern. Every region the
+        player can be in around the stones gives a state, normalized to its
+        top-left-most cell.
+        """
+        if not self.solvable:
+            return []
+        walls = self.walls
+        result = []
+        for order in self.stone_orders():
+            stones = [0] * len(order)
+            for switch, index in zip(self.switches, order):
+                stones[index] = switch
+            stones = tuple(stones)
+            seen = bytearray(self.size)
+            for cell in range(self.size):
+                if walls[cell] or seen[cell] or cell in stones:
+                    continue
+                region, top_left = self.reachable(cell, stones)
+                for other in range(self.size):
+                    if region[other]:
+                        seen[other] = 1
+                result.append((top_left, stones))
+        return result
+
+    def stone_orders(self):
+        """Yield the orders of the stones on the switches, one per weight pattern.
+
+        Within a pattern, stones of equal weight take the switches in index
+        order, so each distinct pattern is built once, in lexicographic order,
+        instead of filtering all n! permutations.
+        """
+        groups = {}  # weight -> indices of the stones of that weight
+        for index, weight in enumerate(self.weights):
+            groups.setdefault(weight, []).append(index)
+        groups = list(groups.values())
+        used = [0] * len(groups)
+        order = []
+
+        def place():
+            if len(order) == len(self.weights):
+                yield tuple(order)
+                return
+            candidates = sorted((group[used[number]], number) for number, group in enumerate(groups)
+                                if used[number] < len(group))
+            for index, number in candidates:
+                used[number] += 1
+                order.append(index)
+                yield from place()
+                order.pop()
+                used[number] -= 1
+
+        return place()
+
+    def walk(self, start, goal, stones):
+        """Shortest walk between two cells that does not push any stone."""
+        if start == goal:
+            return ''
+        blocked = bytearray(self.walls)
+        for cell in stones:
+            blocked[cell] = 1
+        before = {start: None}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            for move, offset in zip(MOVES, self.offsets):
+                neighbour = cell + offset
+                if blocked[neighbour] or neighbour in before:
+                    continue
+                before[neighbour] = (cell, move)
+                if neighbour == goal:
+                    path = []
+                    while neighbour != start:
+                        neighbour, move = before[neighbour]
+                        path.append(move)
+                    return ''.join(reversed(path))
+                queue.append(neighbour)
+        raise ValueError('Player cannot walk to the stone it has to push.')
+
+    def solution(self, moves, pushes=False):
+        """Turn the move codes found by a search into the output move string.
+
+        The pushes of a push-level search and of macros are expanded with
+        the walk the player takes to reach each stone.
+        """
+        if not pushes and self.macros is None:
+            return ''.join(STEPS[move] for move in moves)
+        player = self.player
+        stones = list(self.stones)
+        path = []
+        for move in moves:
+            if move >= MACRO:
+                steps = self.macros.records[move - MACRO]
+            elif pushes:
+                steps = (divmod(move, 4),)
+            else:
+                # A single step: a walk, or a push of the stone next to the player
+                target = player + self.offsets[move % 4]
+                if move >= 4:
+                    stones[stones.index(target)] += self.offsets[move % 4]
+                path.append(STEPS[move])
+                player = target
+                continue
+            for index, direction in steps:
+                stone = stones[index]
+                offset = self.offsets[direction]
+                path.append(self.walk(player, stone - offset, stones))
+                path.append(PUSHES[direction])
+                player = stone
+                stones[index] = stone + offset
+        return ''.join(path)
+
+
+def parse_level(filename):
+    """Read the stone weights and the map rows of an input file."""
+    with open(filename, 'r') as file:
+        weights_line = file.readline().strip()
+        weights = list(map(int, weights_line.split()))
+        grid = [line.rstrip('\n') for line in file]
+    return weights, grid
+
+
+def read_level(filename, dead_squares=True, deadlocks=True, stats=None, macros=()):
+    """Read and parse input file"""
+    weights, grid = parse_level(filename)
+    level = Level(weights, grid, dead_squares, deadlocks, macros)
+    if stats is not None:
+        stats.lap('parse')
+    load_distances(level, filename)
+    if stats is not None:
+        stats.lap('precompute')
+    return level
+
+
+def load_distances(level, filename):
+    """Load the push distances cached next to the input file, or build and cache them.
+
+    input/input-XX.txt is cached in input/input-XX.distances.npz together with
+    the grid hash, so an edited map is never matched with stale distances.
+    """
+    path = os.path.splitext(filename)[0] + '.distances.npz'
+    key = level.grid_hash()
+    try:
+        with np.load(path) as data:
+            if str(data['key']) == key:
+                level._distances = data['distances']
+                return
+    except Exception:
+        pass  # Missing, truncated or foreign file: a miss like any other
+    # Written under a temporary name and renamed, so solvers racing on the
+    # same level never load a half-written file
+    try:
+        descriptor, temporary = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path) or '.')
+    except OSError:
+        return  # Read-only input directory: keep the distances in memory only
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            np.savez(file, key=key, distances=level.distances)
+        os.replace(temporary, path)
+    except OSError:
+        os.remove(temporary)
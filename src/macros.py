@@ -0,0 +1,213 @@
+"""Macro moves: several pushes of one stone taken as a single successor.
+
+tunnels
+    A tunnel cell has walls on both sides across the push direction. When
+    the player pushes a stone from one tunnel cell into the next, the
+    stone can only go on along the tunnel and the player cannot get past
+    it, so it is pushed on until it leaves the tunnel, lands on a switch,
+    or is blocked. A stone pushed into a tunnel from outside is left alone,
+    since it may be parked there for a while.
+goal-rooms
+    A goal room is an area with switches that the rest of the level can
+    only reach through one entrance cell. When a stone is pushed onto the
+    entrance and every stone already in the room sits on a switch, it is
+    pushed straight on to the deepest free switch it can reach. This makes
+    the rooms fill up from the back. The route is the one with the fewest
+    pushes, but which stone ends up on which switch is no longer searched,
+    so with unequal weights the solution may weigh more than the optimum.
+
+A macro gets its own move code, MACRO + its number, whose record is the
+tuple of (stone index, direction) pushes it stands for. Level.solution
+expands it into walks and pushes.
+"""
+
+import argparse
+from collections import deque
+
+MACROS = ('tunnels', 'goal-rooms')
+# Move codes from MACRO up are macros; plain codes stay below it
+MACRO = 1 << 16
+ROUTE_CACHE_SIZE = 1 << 12
+
+
+def parse_macros(text):
+    """Argument type of the --macros options: comma-separated MACROS."""
+    macros = tuple(name.strip() for name in text.split(',') if name.strip())
+    for name in macros:
+        if name not in MACROS:
+            raise argparse.ArgumentTypeError(f"unknown macro {name} (choose from {', '.join(MACROS)})")
+    return macros
+
+
+class MacroMoves:
+    def __init__(self, level, macros):
+        unknown = set(macros) - set(MACROS)
+        if unknown:
+            raise ValueError(f"Unknown macros: {', '.join(sorted(unknown))}")
+        self.level = level
+        self.records = []  # Pushes of every macro code
+        self.codes = {}
+        self.tunnels = self.find_tunnels() if 'tunnels' in macros else None
+        self.rooms = self.find_rooms() if 'goal-rooms' in macros else {}
+        self.routes = {}
+
+    def find_tunnels(self):
+        """Per cell: bit 1 if a vertical push keeps walls on both sides,
+        bit 2 if a horizontal one does."""
+        level = self.level
+        walls = level.walls
+        width = level.width
+        tunnels = bytearray(level.size)
+        for cell in range(width, level.size - width):
+            if walls[cell]:
+                continue
+            if walls[cell - 1] and walls[cell + 1]:
+                tunnels[cell] |= 1
+            if walls[cell - width] and walls[cell + width]:
+                tunnels[cell] |= 2
+        return tunnels
+
+    def find_rooms(self):
+        """Map every goal room entrance to (room cells, switches deepest first)."""
+        level = self.level
+        walls = level.walls
+        is_switch = level.is_switch
+        rooms = {}
+        for entrance in range(level.size):
+            if walls[entrance] or is_switch[entrance]:
+                continue
+            neighbours = [entrance + offset for offset in level.offsets if not walls[entrance + offset]]
+            for start in neighbours:
+                room = self.flood(start, entrance)
+                if all(cell in room for cell in neighbours):
+                    continue  # The entrance does not separate anything
+                if not any(is_switch[cell] for cell in room):
+                    continue
+                if any(stone in room and not is_switch[stone] for stone in level.stones):
+                    continue
+                if level.player in room:
+                    continue
+                depth = self.flood(entrance, None, room | {entrance})
+                switches = sorted((cell for cell in room if is_switch[cell]), key=lambda cell: -depth[cell])
+                rooms[entrance] = (room, switches)
+                break
+        return rooms
+
+    def flood(self, start, blocked, area=None):
+        """Floor cells reachable from start without entering blocked; with
+        area, the BFS distance of every cell of area from start instead."""
+        walls = self.level.walls
+        offsets = self.level.offsets
+        seen = {start: 0}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            for offset in offsets:
+                neighbour = cell + offset
+                if neighbour in seen or neighbour == blocked or walls[neighbour]:
+                    continue
+                if area is not None and neighbour not in area:
+                    continue
+                seen[neighbour] = seen[cell] + 1
+                queue.append(neighbour)
+        return seen if area is not None else set(seen)
+
+    def code(self, pushes):
+        code = self.codes.get(pushes)
+        if code is None:
+            code = self.codes[pushes] = MACRO + len(self.records)
+            self.records.append(pushes)
+        return code
+
+    def push(self, index, stone, direction, stones):
+        """Macro for pushing stone (index in stones) one cell in direction.
+
+        The caller has checked that the single push is legal. Returns
+        (code, stone cell, player cell, pushes) after the macro, or None
+        when no macro applies.
+        """
+        level = self.level
+        offset = level.offsets[direction]
+        cell = stone + offset
+        if cell in self.rooms and stone not in self.rooms[cell][0] and not level.is_switch[cell]:
+            route = self.route(cell, stone, stones[:index] + stones[index + 1:])
+            if route is not None:
+                directions, target, player = route
+                pushes = tuple((index, d) for d in (direction,) + directions)
+                return self.code(pushes), target, player, len(pushes)
+        if self.tunnels is None:
+            return None
+        walls = level.walls
+        dead = level.dead
+        is_switch = level.is_switch
+        axis = 1 if direction < 2 else 2
+        if not self.tunnels[stone] & axis:
+            return None
+        count = 1
+        while self.tunnels[cell] & axis and not is_switch[cell]:
+            following = cell + offset
+            if walls[following] or following in stones or dead[following]:
+                break
+            cell = following
+            count += 1
+        if count == 1:
+            return None
+        code = self.code(((index, direction),) * count)
+        return code, cell, cell - offset, count
+
+    def route(self, entrance, player, others):
+        """Fewest pushes from the entrance to the deepest free switch of its room.
+
+        The stone is on the entrance with the player at player, the cell
+        it was pushed from; others are the remaining stones. Returns
+        (directions, target, player cell) of the pushes after the first
+        one, or None if the room holds a stone off its switches or no
+        free switch can be reached.
+        """
+        key = (entrance, player, others)
+        if key in self.routes:
+            return self.routes[key]
+        room, switches = self.rooms[entrance]
+        level = self.level
+        result = None
+        inside = [stone for stone in others if stone in room]
+        if all(level.is_switch[stone] for stone in inside):
+            free = [switch for switch in switches if switch not in inside]
+            result = self.search_route(entrance, player, others, room, free)
+        if len(self.routes) >= ROUTE_CACHE_SIZE:
+            self.routes.clear()
+        self.routes[key] = result
+        return result
+
+    def search_route(self, entrance, player, others, room, free):
+        level = self.level
+        walls = level.walls
+        offsets = level.offsets
+        start = (entrance, level.normalize(player, others + (entrance,)))
+        before = {start: None}
+        first = {}  # stone cell -> first state that reached it
+        queue = deque([start])
+        while queue:
+            state = queue.popleft()
+            stone, region_player = state
+            first.setdefault(stone, state)
+            region = level.reachable(region_player, others + (stone,))[0]
+            for direction, offset in enumerate(offsets):
+                target = stone + offset
+                if not region[stone - offset] or target not in room or walls[target] or target in others:
+                    continue
+                new_state = (target, level.normalize(stone, others + (target,)))
+                if new_state not in before:
+                    before[new_state] = (state, direction)
+                    queue.append(new_state)
+        target = next((switch for switch in free if switch in first), None)
+        if target is None:
+            return None
+
+        directions = []
+        state = first[target]
+        while before[state] is not None:
+            state, direction = before[state]
+            directions.append(direction)
+        directions.reverse()
+        return tuple(directions), target, target - offsets[directions[-1]]
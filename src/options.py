@@ -0,0 +1,35 @@
+"""Command-line options shared by the solver scripts, solve.py and portfolio.py.
+
+Every search takes the level and pruning options; the heuristic, macro and
+cache options are added by the scripts whose searches take them. An option
+added here reaches every script at once.
+"""
+
+from .cache import DEFAULT_PATH
+from .heuristic import HEURISTICS
+from .macros import MACROS, parse_macros
+
+
+def add_search_arguments(parser, pushes=True, macros=True, heuristic=False, cache=False):
+    """Add the options of a search to parser; the keywords pick the optional ones."""
+    if pushes:
+        parser.add_argument('--pushes', action='store_true', help='search over stone pushes only')
+    parser.add_argument('--no-dead-squares', action='store_true', help='do not prune pushes onto dead squares')
+    parser.add_argument('--no-deadlocks', action='store_true', help='do not prune pushes that freeze stones')
+    if heuristic:
+        parser.add_argument('--heuristic', choices=sorted(HEURISTICS), default='matching',
+                            help='lower bound on the remaining weight (default: matching)')
+    if macros:
+        parser.add_argument('--macros', type=parse_macros, default=(),
+                            help=f"comma-separated macro moves out of {', '.join(MACROS)} (default: none)")
+    if cache:
+        parser.add_argument('--cache', nargs='?', const=DEFAULT_PATH, metavar='PATH',
+                            help=f'reuse and store results in a solution cache (default: {DEFAULT_PATH})')
+
+
+def search_options(args):
+    """(pushes, dead_squares, deadlocks), the leading arguments of every search function.
+
+    A parser without --pushes belongs to a search over pushes only.
+    """
+    return getattr(args, 'pushes', True), not args.no_dead_squares, not args.no_deadlocks
@@ -0,0 +1,130 @@
+"""Replay of solution strings on a flat occupancy array.
+
+The map is laid out like Level's: one cell number per square, a wall row
+above and below and a wall column on the right, so every neighbour of a map
+cell is a valid index and leaving the map is walking into a wall. A cell of
+the occupancy list holds FLOOR, WALL or the number of the stone on it
+(1-based, in input order), so a move costs one dict lookup for its offset
+and one or two list reads. Replaying a solution copies the list of the
+board once; a Board is built once per level and can replay any number of
+solutions of that level.
+
+A replay returns (valid, steps, weight, failing step): the moves made
+before the replay stopped, the sum of the weights pushed by them, and the
+1-based number of the move that could not be made, or len(solution) + 1 if
+every move was made but some stone is off the switches. failing step is
+None for a valid solution. describe() turns a failure into a message.
+"""
+
+from .level import MOVES, PUSHES, parse_level
+
+FLOOR = 0
+WALL = -1
+
+
+class Board:
+    def __init__(self, weights, grid):
+        self.height = len(grid)
+        self.width = max((len(row) for row in grid), default=0) + 1
+        size = (self.height + 2) * self.width
+        offsets = (-self.width, self.width, -1, 1)
+        self.walks = dict(zip(MOVES, offsets))
+        self.pushes = dict(zip(PUSHES, offsets))
+
+        self.cells = [WALL] * size
+        self.player = None
+        stones = 0
+        switches = []
+        for i, row in enumerate(grid):
+            for j, char in enumerate(row):
+                cell = (i + 1) * self.width + j
+                if char == '#':
+                    continue
+                self.cells[cell] = FLOOR
+                if char == '@':
+                    self.player = cell
+                elif char in '$*':
+                    stones += 1
+                    self.cells[cell] = stones
+                if char in '.*':
+                    switches.append(cell)
+
+        if self.player is None:
+            raise ValueError("Player starting position '@' not found.")
+        if stones != len(weights):
+            raise ValueError('Number of stones does not match number of weights.')
+        # Stone numbers start at 1, FLOOR indexes the unused weight 0
+        self.weights = (0, *weights)
+        self.switches = tuple(switches)
+        self.solvable = stones == len(switches)
+
+    def coords(self, cell):
+        i, j = divmod(cell, self.width)
+        return i - 1, j
+
+    def play(self, solution):
+        """Make the moves of solution; returns (cells, player, steps, weight, failing step)."""
+        cells = self.cells.copy()
+        player = self.player
+        walks = self.walks
+        pushes = self.pushes
+        weights = self.weights
+        weight = 0
+        for step, move in enumerate(solution, 1):
+            offset = walks.get(move)
+            if offset is not None:
+                if cells[player + offset]:
+                    return cells, player, step - 1, weight, step
+                player += offset
+                continue
+            offset = pushes.get(move)
+            if offset is None:
+                return cells, player, step - 1, weight, step
+            player += offset
+            stone = cells[player]
+            if stone <= FLOOR or cells[player + offset]:
+                return cells, player - offset, step - 1, weight, step
+            cells[player + offset] = stone
+            cells[player] = FLOOR
+            weight += weights[stone]
+        return cells, player, len(solution), weight, None
+
+    def replay(self, solution):
+        """Replay solution; returns (valid, steps, weight, failing step)."""
+        cells, _, steps, weight, failing = self.play(solution)
+        if failing is None and not (self.solvable and all(cells[cell] > FLOOR for cell in self.switches)):
+            failing = steps + 1
+        return failing is None, steps, weight, failing
+
+    def replay_all(self, solutions):
+        """Replay every solution of this level; returns one replay() tuple each."""
+        return [self.replay(solution) for solution in solutions]
+
+    def describe(self, solution, failing):
+        """Message explaining why move number failing of solution went wrong."""
+        if failing is None:
+            return ''
+        if failing > len(solution):
+            return 'Not all stones are on switches at the end of the solution.'
+        cells, player, _, _, _ = self.play(solution[:failing - 1])
+        move = solution[failing - 1]
+        offset = self.walks.get(move, self.pushes.get(move))
+        if offset is None:
+            return f"Invalid move '{move}' in solution at step {failing}."
+        target = player + offset
+        if cells[target] == WALL:
+            return f'Player walks into a wall at position {self.coords(target)} at step {failing}.'
+        if cells[target] == FLOOR:
+            return (f"Attempted to push with uppercase move '{move}' but no stone "
+                    f'at position {self.coords(target)} at step {failing}.')
+        if cells[target + offset]:
+            return (f'Cannot push stone from {self.coords(target)} to {self.coords(target + offset)} '
+                    f'at step {failing}.')
+        return (f"Attempted to push stone with lowercase move '{move}' "
+                f'at position {self.coords(target)} at step {failing}.')
+
+
+def replay_file(filename, solutions):
+    """Replay every solution on the level in filename, which is parsed once."""
+    weights, grid = parse_level(filename)
+    return Board(weights, grid).replay_all(solutions)
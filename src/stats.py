@@ -0,0 +1,143 @@
+"""Counters and timings of one search, shared by all the solvers.
+
+Every solver fills in a Stats while it runs and writes its output file with
+write_record(). That way the numbers in output/ mean the same thing no
+matter which algorithm produced them:
+
+    Node         states taken off the frontier and expanded
+    Generated    successors of those states that were not pruned
+    Duplicates   successors dropped because their state was already reached
+                 at the same or a lower cost
+    Frontier     largest number of open states at any time
+    Closed       states in the visited / cost table at the end
+    Time (ms)    search plus path reconstruction. Parse and precompute
+                 times are listed separately.
+    Memory (MB)  largest resident set size of the process. It is sampled
+                 every SAMPLE_EVERY expansions.
+
+Counting costs a few integer operations per expansion. Memory sampling is
+the only system call, and it can be switched off.
+"""
+
+import os
+import time
+
+import psutil
+
+from .budget import no_solution
+
+SAMPLE_EVERY = 1024
+PHASES = ('parse', 'precompute', 'search', 'reconstruct')
+
+
+class Stats:
+    def __init__(self, memory=True, sample_every=SAMPLE_EVERY):
+        self.memory = memory  # sample the resident set size
+        self.sample_every = sample_every
+        self.process = None
+        self.reset()
+
+    def reset(self):
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.pruned = 0
+        self.deadlocks = 0
+        self.peak_frontier = 0
+        self.closed = 0
+        self.peak_memory = 0  # bytes
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.next_sample = 0 if self.memory else float('inf')
+        self.mark = time.perf_counter()
+
+    def start(self):
+        """Reset the counters and start the clock; returns self."""
+        self.reset()
+        if self.memory and self.process is None:
+            self.process = psutil.Process()
+        self.sample()
+        return self
+
+    def lap(self, phase):
+        """Add the time since the previous lap to phase."""
+        now = time.perf_counter()
+        self.phases[phase] += (now - self.mark) * 1000
+        self.mark = now
+
+    def expand(self, frontier):
+        """Count one expansion, with frontier open states before it."""
+        self.expanded += 1
+        if frontier > self.peak_frontier:
+            self.peak_frontier = frontier
+        if self.expanded >= self.next_sample:
+            self.sample()
+
+    def sample(self):
+        if not self.memory:
+            return
+        self.next_sample = self.expanded + self.sample_every
+        rss = self.process.memory_info().rss
+        if rss > self.peak_memory:
+            self.peak_memory = rss
+
+    def finish(self, level, closed):
+        """Copy the pruning counters of level and record the closed set size."""
+        self.pruned = level.pruned
+        self.deadlocks = level.deadlocked
+        self.closed = closed
+        self.sample()
+
+    @property
+    def time_ms(self):
+        return self.phases['search'] + self.phases['reconstruct']
+
+    @property
+    def memory_mb(self):
+        return self.peak_memory / (1024 * 1024)
+
+    def summary(self):
+        """Counters and phase times that follow the path in the output file."""
+        phases = ', '.join(f'{phase.capitalize()} (ms): {self.phases[phase]:.2f}' for phase in PHASES)
+        return (f'Generated: {self.generated}, Duplicates: {self.duplicates}, '
+                f'Frontier: {self.peak_frontier}, Closed: {self.closed}, {phases}')
+
+    def __getstate__(self):
+        # psutil handles stay in the process that created them
+        state = self.__dict__.copy()
+        state['process'] = None
+        return state
+
+
+def write_record(filename, algorithm, stats, solution=None, weight=None, budget=None):
+    """Write the output file of one search.
+
+    The first three lines are read by main.py and Checker.py: the algorithm,
+    the result line and the move string. If nothing was found, they are the
+    failure message and the result line. The last line is stats.summary().
+    The file is replaced in one step, because an anytime search rewrites it
+    while the GUI may be reading it.
+    """
+    memory = f'{stats.memory_mb:.2f}' if stats.memory else 'n/a'
+    counters = (f'Pruned: {stats.pruned}, Deadlocks: {stats.deadlocks}, '
+                f'Time (ms): {stats.time_ms:.2f}, Memory (MB): {memory}')
+    temporary = filename + '.tmp'
+    with open(temporary, 'w') as file:
+        if solution is not None:
+            file.write(f'{algorithm}\n')
+            file.write(f'Steps: {len(solution)}, Weight: {weight}, Node: {stats.expanded}, {counters}\n')
+            file.write(solution + '\n')
+        else:
+            file.write(no_solution(budget) + '\n')
+            file.write(f'Nodes Expanded: {stats.expanded}, {counters}\n')
+        file.write(stats.summary() + '\n')
+    os.replace(temporary, filename)
+
+
+def read_record(filename):
+    """(solved, weight) from an output file written by write_record()."""
+    with open(filename) as file:
+        lines = file.readlines()
+    if not lines or lines[0].startswith('No solution'):
+        return False, None
+    fields = dict(field.split(': ') for field in lines[1].strip().split(', '))
+    return True, int(fields['Weight'])
@@ -0,0 +1,53 @@
+"""Fixed-size transposition table for iterative deepening.
+
+IDA* keeps no open or closed list, so without a table it re-expands a
+state once for every path that leads to it. The table remembers the
+cheapest g each state was reached with during the current iteration, so a
+later path that is no cheaper can be cut off. It is a hash table of 2^bits
+slots in flat arrays with no chaining, which keeps its memory fixed. When
+two states want the same slot, the one reached with the smaller g is kept:
+it sits higher up the tree, where a cut saves more work.
+"""
+
+from array import array
+
+DEFAULT_BITS = 18
+
+
+class TranspositionTable:
+    def __init__(self, bits=DEFAULT_BITS):
+        size = 1 << bits
+        self.mask = size - 1
+        self.keys = array('Q', bytes(8 * size))
+        self.costs = array('I', bytes(4 * size))
+        # Iteration that wrote each slot; slots of earlier iterations are free
+        self.stamps = array('I', bytes(4 * size))
+        self.iteration = 0
+        self.used = 0
+
+    def __len__(self):
+        return self.used
+
+    @property
+    def size(self):
+        return len(self.keys)
+
+    def new_iteration(self):
+        """Forget every entry; the costs only hold for one cost bound."""
+        self.iteration += 1
+        self.used = 0
+
+    def visit(self, key, g):
+        """Record reaching key at cost g; False if it was reached as cheaply before."""
+        slot = key & self.mask
+        if self.stamps[slot] != self.iteration:
+            self.used += 1
+        elif self.keys[slot] == key:
+            if self.costs[slot] <= g:
+                return False
+        elif self.costs[slot] <= g:
+            return True  # Keep the shallower entry already in the slot
+        self.keys[slot] = key
+        self.costs[slot] = g
+        self.stamps[slot] = self.iteration
+        return True
@@ -0,0 +1,37 @@
+"""Compact storage of the paths explored by a search.
+
+Every generated node is one entry in two typed arrays: the index of its
+parent node and the code of the move that led to it. The frontier and the
+visited tables only hold node indices, and the move sequence is rebuilt
+once, when the goal is found.
+"""
+
+from array import array
+
+ROOT = 0
+
+
+class SearchTree:
+    def __init__(self):
+        self.parents = array('I', [ROOT])
+        self.moves = array('I', [0])
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self, parent, move):
+        """Record a node reached from parent with move; return its index."""
+        self.parents.append(parent)
+        self.moves.append(move)
+        return len(self.parents) - 1
+
+    def path(self, node):
+        """Move codes from the root to node."""
+        parents = self.parents
+        moves = self.moves
+        path = []
+        while node != ROOT:
+            path.append(moves[node])
+            node = parents[node]
+        path.reverse()
+        return path
@@ -0,0 +1,30 @@
+"""Pruning pushes onto dead squares must not change the cost of the solutions."""
+
+import os
+
+import pytest
+
+import A
+import UCS
+from src.stats import Stats, read_record
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEVELS = range(1, 11)
+SEARCHES = {'A': A.search, 'UCS': UCS.Search}
+
+
+def solve(algorithm, level_id, pushes, dead_squares):
+    filename = os.path.join(ROOT, 'input', f'input-{level_id:02d}.txt')
+    SEARCHES[algorithm](filename, level_id, pushes, dead_squares, stats=Stats(memory=False))
+    return read_record(os.path.join('output', algorithm, f'output-{level_id:02d}.txt'))
+
+
+@pytest.mark.parametrize('level_id', LEVELS)
+@pytest.mark.parametrize('pushes', [False, True], ids=['steps', 'pushes'])
+@pytest.mark.parametrize('algorithm', sorted(SEARCHES))
+def test_same_weight_with_and_without_dead_squares(algorithm, pushes, level_id, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the solvers write output/<ALG>/output-XX.txt
+    pruned = solve(algorithm, level_id, pushes, True)
+    unpruned = solve(algorithm, level_id, pushes, False)
+    assert pruned[0]
+    assert pruned == unpruned